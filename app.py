@@ -1,7 +1,19 @@
 import os
-import json
 import logging
+import click
 from flask import Flask, render_template, request, redirect, url_for
+from jinja2 import ChoiceLoader, DictLoader
+from catalog import ProjectCatalog
+from churn import ChurnModelStore
+from shared_catalog import SharedCatalogStore
+from bundles import AssetManifest
+from downloads import ArtifactStore, precompress
+from electricity import ElectricityData
+from tiles import TileStore
+from inline_templates import INLINE_TEMPLATES
+from knowledge_base import KnowledgeBase
+from metrics import RequestMetrics
+from response_cache import ResponseCache
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -10,17 +22,65 @@ logging.basicConfig(level=logging.DEBUG)
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 
+# Built-in pages resolve after templates/, so a file there overrides them
+app.jinja_loader = ChoiceLoader([app.jinja_loader, DictLoader(INLINE_TEMPLATES)])
+
+# Parsed once per process and revalidated with stat() on each access. With
+# CATALOG_SHARED_DIR set, parsed once per host and shared by all workers.
+shared_catalog_dir = os.environ.get("CATALOG_SHARED_DIR")
+catalog = ProjectCatalog('data/projects.json',
+                         store=SharedCatalogStore(shared_catalog_dir) if shared_catalog_dir else None)
+
+# Rendered catalog pages, emptied whenever the catalog version changes
+page_cache = ResponseCache(max_bytes=int(os.environ.get("PAGE_CACHE_BYTES", 32 * 1024 * 1024)))
+
+# Resume, transcript and code artifacts, resolved against the app directory
+downloads = ArtifactStore(os.path.join(app.root_path, 'static', 'downloads'))
+
+# CSS/JS of the built-in pages, minified and content-hashed into static/dist
+# and served from /assets/ with a year-long immutable max-age
+asset_manifest = AssetManifest(os.path.join(app.root_path, 'assets'),
+                               os.path.join(app.root_path, 'static', 'dist'))
+bundle_files = ArtifactStore(asset_manifest.dist_dir, max_age=365 * 24 * 3600, immutable=True)
+
+@app.context_processor
+def asset_helpers():
+    return {'asset_url': asset_manifest.url}
+
+# Churn model behind /api/churn/predict, mapped once per process from the
+# artifact create_model.py publishes; churn_model.pkl is only a download
+churn_models = ChurnModelStore(os.environ.get("CHURN_MODEL_DIR", os.path.join(app.root_path, 'data', 'churn_model')))
+
+# /api/churn/explain responses keyed by input hash; emptied when the model version changes
+explain_cache = ResponseCache(max_bytes=int(os.environ.get("CHURN_EXPLAIN_CACHE_BYTES", 16 * 1024 * 1024)),
+                              max_entries=256)
+
+# Q&A entries answering the financial services demo, indexed once per process
+knowledge_base = KnowledgeBase(os.environ.get("FINANCIAL_KB_PATH", os.path.join(app.root_path, 'financial_kb.json')))
+
+# Meter readings behind /dashboard/, kept as a memory-mapped tile pyramid
+# and seeded with synthetic data on first use
+electricity = ElectricityData(
+    TileStore(os.environ.get("DASHBOARD_TILE_DIR", os.path.join(app.root_path, 'data', 'electricity_tiles'))),
+    rows=int(os.environ.get("DASHBOARD_ROWS", 2_000_000)),
+    meters=int(os.environ.get("DASHBOARD_METERS", 8)))
+
+# Per-endpoint request metrics, exported on /metrics
+metrics = RequestMetrics(app)
+metrics.add_gauge('portfolio_catalog_reloads_total', 'Times projects.json was parsed',
+                  lambda: catalog.reloads, kind='counter')
+metrics.add_gauge('portfolio_page_cache_hits_total', 'Page cache hits',
+                  lambda: page_cache.hits, kind='counter')
+metrics.add_gauge('portfolio_page_cache_misses_total', 'Page cache misses',
+                  lambda: page_cache.misses, kind='counter')
+metrics.add_gauge('portfolio_page_cache_hit_ratio', 'Page cache hits over lookups',
+                  lambda: page_cache.hit_ratio)
+metrics.add_gauge('portfolio_page_cache_bytes', 'Bytes held by the page cache',
+                  lambda: page_cache.size_bytes)
+
 def load_projects():
     """Load projects from JSON data file"""
-    try:
-        with open('data/projects.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logging.error("Projects data file not found")
-        return {"projects": [], "technologies": [], "categories": []}
-    except json.JSONDecodeError:
-        logging.error("Invalid JSON in projects data file")
-        return {"projects": [], "technologies": [], "categories": []}
+    return catalog.snapshot().data
 
 def get_unique_technologies(projects):
     """Extract unique technologies from all projects"""
@@ -36,8 +96,114 @@ def get_unique_categories(projects):
         categories.add(project.get('category', 'Other'))
     return sorted(list(categories))
 
+def precompile_templates():
+    """Compile the built-in page templates into the Jinja cache"""
+    for name in INLINE_TEMPLATES:
+        app.jinja_env.get_template(name)
+
+# Pages rendered once per worker before it accepts traffic
+WARM_UP_PATHS = ('/', '/about', '/financial-services-demo')
+
+def warm_caches():
+    """Load the catalog, meter tiles, knowledge base, asset bundles and churn model and compile every template"""
+    catalog.snapshot()
+    electricity.ensure()
+    knowledge_base.ensure()
+    asset_manifest.manifest()
+    try:
+        churn_models.get()
+    except FileNotFoundError as exc:
+        logging.warning("Churn model not loaded: %s", exc)
+    for name in app.jinja_env.list_templates(filter_func=lambda name: name.endswith('.html')):
+        app.jinja_env.get_template(name)
+
+def warm_up_requests(project_pages=20):
+    """Render the main pages so the first real visitors hit warm caches"""
+    client = app.test_client()
+    paths = list(WARM_UP_PATHS)
+    paths += [f"/project/{p.get('id')}" for p in catalog.snapshot().projects[:project_pages]]
+    for path in paths:
+        response = client.get(path)
+        if response.status_code >= 500:
+            logging.warning("Warm-up request %s returned %s", path, response.status_code)
+
+@app.cli.command('precompress-downloads')
+def precompress_downloads():
+    """Write gzip/brotli variants of compressible files in static/downloads, served from /static/downloads/"""
+    for path in precompress(downloads.directory):
+        print(f"Wrote {path}")
+    downloads.clear()
+
+@app.cli.command('build-assets')
+def build_assets():
+    """Minify and fingerprint the page bundles into static/dist"""
+    for name, hashed in sorted(asset_manifest.rebuild().items()):
+        print(f"{name} -> {hashed}")
+    bundle_files.clear()
+
+@app.cli.command('ingest-readings')
+@click.argument('path')
+@click.option('--chunk-rows', default=1_000_000, help='CSV rows read per chunk')
+def ingest_readings(path, chunk_rows):
+    """Append meter readings from a CSV with timestamp, meter and kwh columns"""
+    import pandas as pd
+    stored = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, parse_dates=['timestamp']):
+        for meter, readings in chunk.groupby('meter', sort=False):
+            stored += electricity.append(str(meter), readings['timestamp'].to_numpy('datetime64[ns]'),
+                                         readings['kwh'].to_numpy())
+    print(f"Stored {stored} new readings")
+
+@app.cli.command('export-churn-model')
+@click.argument('path', default=os.path.join('static', 'downloads', 'churn_model.pkl'))
+def export_churn_model(path):
+    """Publish a pickled model from create_model.py as the served artifact"""
+    import pickle
+    from churn import save_model
+    with open(path, 'rb') as f:
+        model_data = pickle.load(f)
+    print(f"Published churn model version {save_model(churn_models.root, model_data)}")
+
+@app.cli.command('generate-churn-data')
+@click.argument('directory', default=os.path.join('data', 'churn_dataset'))
+@click.option('--rows', default=10_000_000, help='customers to generate')
+@click.option('--seed', default=42)
+@click.option('--chunk-rows', default=1 << 18, help='rows generated per chunk')
+@click.option('--csv', 'csv_path', help='also write the rows as CSV for /api/churn/score')
+def generate_churn_data(directory, rows, seed, chunk_rows, csv_path):
+    """Write synthetic churn customers as memory-mapped columns"""
+    from churn_data import write_dataset
+    dataset = write_dataset(directory, rows, seed=seed, chunk_rows=chunk_rows)
+    print(f"Wrote {len(dataset)} rows to {directory} (churn rate {dataset.info['churn_rate']})")
+    if csv_path:
+        with open(csv_path, 'w', newline='') as f:
+            dataset.write_csv(f, chunk_rows=chunk_rows)
+        print(f"Wrote {csv_path}")
+
+@app.cli.command('freeze')
+@click.argument('directory', default=os.path.join('data', 'static_site'))
+@click.option('--workers', type=int, help='render processes (default: one per core)')
+@click.option('--force', is_flag=True, help='render every page, ignoring the previous manifest')
+def freeze_site(directory, workers, force):
+    """Export the catalog pages as static HTML, re-rendering only pages whose inputs changed"""
+    from freeze import freeze
+    summary = freeze(app, catalog, asset_manifest, os.path.join(app.root_path, 'static'), directory,
+                     workers=workers, force=force)
+    print(f"{summary['pages']} pages in {directory}: {summary['rendered']} rendered "
+          f"({summary['written']} changed), {summary['removed']} removed in {summary['seconds']}s")
+
 # Import routes
 from routes import *
 
+# The Dash dashboard is optional; /launch-dashboard 404s without it
+try:
+    from dashboard import init_dashboard
+except ImportError as exc:
+    logging.warning("Electricity dashboard disabled: %s", exc)
+else:
+    init_dashboard(app, electricity)
+
+precompile_templates()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=7323, debug=True)
@@ -0,0 +1,237 @@
+"""ASGI entry point, alongside the WSGI one in main.py
+
+    uvicorn asgi:application --host 0.0.0.0 --port 7323
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:application
+
+The Flask views stay synchronous and run on a bounded thread pool.
+Response bodies (files from /downloads/*, streamed code previews) are
+pulled one chunk at a time and written with `await send(...)`, so a
+slow reader waits on the loop, not on a thread, and one process can
+hold thousands of slow connections.
+
+Request bodies up to BUFFERED_BODY_BYTES are read on the loop before
+the view runs. Larger or chunked uploads (/api/churn/score) are fed to
+wsgi.input on demand, which blocks a pool thread while the client
+sends; at most ASGI_UPLOADS of them run at once per event loop, so slow
+uploaders cannot take every thread.
+
+The pool belongs to the process, not to one server: lifespan shutdown
+leaves it running, so a later server in the same process (a test or a
+benchmark run) can still use it.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import sys
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app, catalog
+
+# Response bytes gathered per executor hop when pulling a WSGI body
+BODY_CHUNK_BYTES = 64 * 1024
+
+# Request bodies with a Content-Length up to this are read on the loop
+BUFFERED_BODY_BYTES = 1024 * 1024
+
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get("ASGI_THREADS", 32)),
+                              thread_name_prefix='asgi-view')
+
+# Streamed uploads holding a pool thread at once; keep it below ASGI_THREADS
+MAX_UPLOADS = int(os.environ.get("ASGI_UPLOADS", 8))
+
+# asyncio primitives bind to the first loop that waits on them, so each
+# event loop gets its own semaphore
+_upload_slots = weakref.WeakKeyDictionary()
+
+_END = object()
+
+
+def upload_slots(loop):
+    """Semaphore bounding this event loop's streamed uploads"""
+    slots = _upload_slots.get(loop)
+    if slots is None:
+        slots = _upload_slots[loop] = asyncio.Semaphore(MAX_UPLOADS)
+    return slots
+
+
+class _RequestBody:
+    """wsgi.input that pulls http.request messages from the event loop"""
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._more = True
+
+    def _append(self, message):
+        if message['type'] == 'http.disconnect':
+            self._more = False
+            return
+        self._buffer += message.get('body', b'')
+        self._more = message.get('more_body', False)
+
+    async def buffer(self):
+        """Read the whole body on the loop"""
+        while self._more:
+            self._append(await self._receive())
+
+    def _fill(self, size):
+        while self._more and (size < 0 or len(self._buffer) < size):
+            self._append(asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result())
+
+    def read(self, size=-1):
+        if size is None:
+            size = -1
+        self._fill(size)
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def readline(self, size=-1):
+        while self._more and b'\n' not in self._buffer and (size < 0 or len(self._buffer) < size):
+            self._fill(len(self._buffer) + 1)
+        end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+        if size >= 0:
+            end = min(end, size)
+        return self.read(end)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+def _environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        # The body reports its own end, so chunked uploads without a
+        # Content-Length are not read as empty
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _call_wsgi(environ):
+    """Run the Flask app in a worker thread; returns (status, headers, iterator)"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                              for name, value in headers]
+
+    iterable = app.wsgi_app(environ, start_response)
+    return started['status'], started['headers'], iterable, iter(iterable)
+
+
+def _next_chunk(iterator):
+    """Gather up to BODY_CHUNK_BYTES from a WSGI body, or _END when exhausted"""
+    parts = []
+    size = 0
+    for chunk in iterator:
+        if chunk:
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= BODY_CHUNK_BYTES:
+                break
+    if not parts:
+        return _END
+    return b''.join(parts)
+
+
+async def _lifespan(receive, send):
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Parse the catalog before the first request arrives
+            await loop.run_in_executor(executor, catalog.snapshot)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # The pool is left running for any later server in this process
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI callable serving the Flask app"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    loop = asyncio.get_running_loop()
+    body = _RequestBody(receive, loop)
+    environ = _environ(scope, body)
+    length = environ.get('CONTENT_LENGTH', '')
+    if length.isdigit() and int(length) <= BUFFERED_BODY_BYTES:
+        await body.buffer()
+    elif length or 'HTTP_TRANSFER_ENCODING' in environ:
+        # A streamed upload: the view's reads block a pool thread
+        async with upload_slots(loop):
+            await _respond(send, loop, environ)
+        return
+    await _respond(send, loop, environ)
+
+
+async def _respond(send, loop, environ):
+    """Run the view on the pool and stream its response"""
+    # Every hop for this request runs in one context so Flask's request
+    # context (kept in contextvars) survives moving between pool threads
+    context = contextvars.Context()
+    try:
+        status, headers, iterable, iterator = await loop.run_in_executor(
+            executor, context.run, _call_wsgi, environ)
+    except Exception:
+        logging.exception("Unhandled error in ASGI request")
+        await send({'type': 'http.response.start', 'status': 500,
+                    'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+        await send({'type': 'http.response.body', 'body': b'Internal server error'})
+        return
+
+    try:
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        while True:
+            chunk = await loop.run_in_executor(executor, context.run, _next_chunk, iterator)
+            if chunk is _END:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        close = getattr(iterable, 'close', None)
+        if close is not None:
+            await loop.run_in_executor(executor, context.run, close)
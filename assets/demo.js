@@ -0,0 +1,133 @@
+// AI Financial Advisor Functions
+function fetchAnswer(topic, question) {
+    const params = new URLSearchParams({topic: topic, q: question});
+    return fetch('/api/financial-demo/answer?' + params)
+        .then(response => response.json())
+        .then(data => data.answer || data.error)
+        .catch(() => 'The answer service is unavailable right now. Please try again.');
+}
+
+function askAI(question) {
+    showLoading('aiLoading');
+    hideElement('aiResponse');
+    fetchAnswer('advisor', question).then(showAIResponse);
+}
+
+function askCustomQuestion() {
+    const question = document.getElementById('customQuestion').value.trim();
+    if (!question) {
+        alert('Please enter a question first.');
+        return;
+    }
+    askAI(question);
+}
+
+// Market Data Functions
+function loadMarketData(symbol) {
+    showLoading('marketLoading');
+    hideElement('marketData');
+
+    setTimeout(() => {
+        const data = generateMockMarketData(symbol);
+        showMarketData(data);
+    }, 1500);
+}
+
+function loadCustomStock() {
+    const symbol = document.getElementById('stockSymbol').value.trim().toUpperCase();
+    if (!symbol) {
+        alert('Please enter a stock symbol.');
+        return;
+    }
+    loadMarketData(symbol);
+}
+
+function generateMockMarketData(symbol) {
+    const basePrice = Math.random() * 200 + 50;
+    const change = (Math.random() - 0.5) * 10;
+    const changePercent = (change / basePrice * 100).toFixed(2);
+
+    return {
+        symbol: symbol,
+        price: basePrice.toFixed(2),
+        change: change.toFixed(2),
+        changePercent: changePercent,
+        volume: (Math.random() * 10000000).toFixed(0),
+        marketCap: ((basePrice * Math.random() * 1000000000) / 1000000).toFixed(0) + 'M'
+    };
+}
+
+function showMarketData(data) {
+    const changeClass = parseFloat(data.change) >= 0 ? 'text-success' : 'text-danger';
+    const changeIcon = parseFloat(data.change) >= 0 ? 'fa-arrow-up' : 'fa-arrow-down';
+
+    document.getElementById('marketData').innerHTML = `
+        <div class="market-data">
+            <h5 class="text-light">${data.symbol} - Stock Information</h5>
+            <div class="row">
+                <div class="col-md-3">
+                    <strong class="text-light">Current Price:</strong><br>
+                    <span class="h4 text-primary">$${data.price}</span>
+                </div>
+                <div class="col-md-3">
+                    <strong class="text-light">Daily Change:</strong><br>
+                    <span class="${changeClass}">
+                        <i class="fas ${changeIcon}"></i> $${Math.abs(data.change)} (${Math.abs(data.changePercent)}%)
+                    </span>
+                </div>
+                <div class="col-md-3">
+                    <strong class="text-light">Volume:</strong><br>
+                    <span class="text-info">${parseInt(data.volume).toLocaleString()}</span>
+                </div>
+                <div class="col-md-3">
+                    <strong class="text-light">Market Cap:</strong><br>
+                    <span class="text-warning">$${data.marketCap}</span>
+                </div>
+            </div>
+            <small class="text-muted"><i class="fas fa-info-circle"></i> Live data would be provided by Alpha Vantage API integration</small>
+        </div>
+    `;
+    hideElement('marketLoading');
+    showElement('marketData');
+}
+
+// Customer Support Functions
+function getSupport(question) {
+    showLoading('supportLoading');
+    hideElement('supportResponse');
+    fetchAnswer('support', question).then(showSupportResponse);
+}
+
+function getCustomSupport() {
+    const question = document.getElementById('supportQuestion').value.trim();
+    if (!question) {
+        alert('Please describe your issue first.');
+        return;
+    }
+    getSupport(question);
+}
+
+// Utility Functions
+function showLoading(elementId) {
+    document.getElementById(elementId).style.display = 'block';
+}
+
+function hideElement(elementId) {
+    document.getElementById(elementId).style.display = 'none';
+}
+
+function showElement(elementId) {
+    document.getElementById(elementId).style.display = 'block';
+}
+
+function showAIResponse(content) {
+    document.getElementById('aiResponseText').innerHTML = content;
+    hideElement('aiLoading');
+    showElement('aiResponse');
+}
+
+function showSupportResponse(content) {
+    document.getElementById('supportResponseText').innerHTML = content;
+    hideElement('supportLoading');
+    showElement('supportResponse');
+}
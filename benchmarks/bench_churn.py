@@ -0,0 +1,119 @@
+"""Churn scoring benchmark: flat forest engine against sklearn
+
+Scores random customers at batch sizes from 1 to 1M rows with the
+engine behind /api/churn/predict and with the sklearn scaler + forest
+it was compiled from, and checks that both give the same probabilities.
+Also times loading the served artifact against unpickling the model.
+
+On one core the flat engine wins where sklearn's per-call overhead
+dominates (about 100x at 1 row, 2.5x at 1k rows for the default
+200-tree depth-6 model) and is 10-20% slower from about 10k rows up,
+where sklearn's compiled per-tree traversal takes over.
+
+    python -m benchmarks.bench_churn --sizes 1,10,100,1000,10000,100000,1000000
+"""
+import argparse
+import json
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_routes import percentile
+from churn import ChurnModelStore
+from churn_data import ChurnDataset, generate_chunk
+
+DEFAULT_SIZES = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def time_calls(func, X, repeat, max_seconds):
+    """Sorted latencies of repeated calls, within a time budget"""
+    latencies = []
+    started = time.perf_counter()
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(X)
+        latencies.append(time.perf_counter() - t0)
+        if time.perf_counter() - started > max_seconds:
+            break
+    latencies.sort()
+    return latencies, result
+
+
+def run(args):
+    t0 = time.perf_counter()
+    model = ChurnModelStore(args.model).get()
+    artifact_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    with open(args.pickle, 'rb') as f:
+        reference = pickle.load(f)
+    pickle_ms = (time.perf_counter() - t0) * 1000
+    print(f"load artifact {artifact_ms:8.2f} ms  unpickle {pickle_ms:8.2f} ms", file=sys.stderr)
+
+    if args.data:
+        X_all = ChurnDataset(args.data).matrix(0, max(args.sizes))
+    else:
+        X_all = generate_chunk(np.random.default_rng(0), max(args.sizes))[0]
+    if len(X_all) < max(args.sizes):
+        raise SystemExit(f"{args.data} has only {len(X_all)} rows")
+
+    def sklearn_proba(X):
+        return reference['model'].predict_proba(reference['scaler'].transform(X))[:, 1]
+
+    results = {}
+    for size in args.sizes:
+        X = X_all[:size]
+        entry = {}
+        for name, func in (('flat', model.predict_proba), ('sklearn', sklearn_proba)):
+            if name == 'sklearn' and size > args.sklearn_max:
+                continue
+            latencies, proba = time_calls(func, X, args.repeat, args.max_seconds)
+            entry[name] = {
+                'p50_ms': percentile(latencies, 50) * 1000,
+                'p95_ms': percentile(latencies, 95) * 1000,
+                'rows_per_s': size / percentile(latencies, 50),
+            }
+            entry.setdefault('proba', {})[name] = proba
+        probas = entry.pop('proba')
+        if 'sklearn' in probas:
+            entry['max_abs_diff'] = float(np.abs(probas['flat'] - probas['sklearn']).max())
+        results[str(size)] = entry
+        line = f"{size:>8d} rows  flat p50 {entry['flat']['p50_ms']:10.2f} ms"
+        if 'sklearn' in entry:
+            line += (f"  sklearn p50 {entry['sklearn']['p50_ms']:10.2f} ms"
+                     f"  speedup {entry['sklearn']['p50_ms'] / entry['flat']['p50_ms']:6.2f}x"
+                     f"  max diff {entry['max_abs_diff']:.1e}")
+        print(line, file=sys.stderr)
+    return {'model_version': model.version, 'load_artifact_ms': artifact_ms, 'unpickle_ms': pickle_ms,
+            'trees': model.forest.n_trees, 'nodes': model.forest.n_nodes, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='data/churn_model', help='artifact directory')
+    parser.add_argument('--pickle', default='static/downloads/churn_model.pkl', help='sklearn reference model')
+    parser.add_argument('--data', help='churn_data dataset to score (default: generated customers)')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-seconds', type=float, default=5.0, help='time budget per size and engine')
+    parser.add_argument('--sklearn-max', type=int, default=1000000, help='largest batch also run through sklearn')
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    parser.add_argument('--out', help='write results JSON here')
+    args = parser.parse_args(argv)
+    args.sizes = sorted(int(size) for size in args.sizes.split(','))
+
+    results = run(args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    mismatched = [size for size, entry in results['results'].items()
+                  if entry.get('max_abs_diff', 0.0) > args.tolerance]
+    for size in mismatched:
+        print(f"MISMATCH at {size} rows: {results['results'][size]['max_abs_diff']:.2e}", file=sys.stderr)
+    return 1 if mismatched else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
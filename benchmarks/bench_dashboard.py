@@ -0,0 +1,106 @@
+"""Callback latency benchmark for the electricity dashboard
+
+Seeds a fresh tile store with synthetic meter data, then times the
+dashboard's figure and summary computation for every granularity over
+the full history, a month and a zoomed-in day, as the update callback
+would run them, plus an incremental append of one day of readings.
+
+    python -m benchmarks.bench_dashboard --rows 10000000 --budget-ms 100
+
+Exits with status 1 when any case's p95 exceeds --budget-ms.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_routes import percentile
+from electricity import GRANULARITIES, READING_INTERVAL, ElectricityData
+from tiles import TileStore
+
+
+def cases(data):
+    first, last = data.span()
+    month = last - np.timedelta64(30, 'D')
+    day = last - np.timedelta64(1, 'D')
+    for granularity in GRANULARITIES:
+        yield f'{granularity}/all', granularity, first, last
+        yield f'{granularity}/month', granularity, month, last
+    yield 'raw/day', 'raw', day, last
+
+
+def run(args):
+    with tempfile.TemporaryDirectory(prefix='portfolio-tiles-') as directory:
+        return _run(args, TileStore(directory))
+
+
+def _run(args, store):
+    from dashboard import build_figure
+
+    data = ElectricityData(store, rows=args.rows, meters=args.meters)
+    started = time.perf_counter()
+    data.ensure()
+    seeded = time.perf_counter() - started
+    meters = data.meters[:args.selected]
+
+    results = {}
+    for label, granularity, start, end in cases(data):
+        latencies = []
+        # The first call maps the tiles in view; later calls reuse the maps
+        for _ in range(args.repeat + 1):
+            t0 = time.perf_counter()
+            build_figure(data, meters, granularity, start, end)
+            data.summary(meters, start, end)
+            latencies.append(time.perf_counter() - t0)
+        cold = latencies.pop(0)
+        latencies.sort()
+        results[label] = {
+            'cold_ms': cold * 1000,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+        }
+        print(f"{label:16s} cold {cold * 1000:8.2f} ms  p50 {results[label]['p50_ms']:8.2f} ms  "
+              f"p95 {results[label]['p95_ms']:8.2f} ms", file=sys.stderr)
+
+    # One more day of readings for the first meter
+    _, last = data.span()
+    times = last + np.arange(96) * READING_INTERVAL
+    t0 = time.perf_counter()
+    store.append(meters[0], times, np.ones(len(times)))
+    appended = time.perf_counter() - t0
+    print(f"append one day   {appended * 1000:8.2f} ms", file=sys.stderr)
+    return {
+        'rows': args.rows,
+        'meters': args.meters,
+        'selected_meters': len(meters),
+        'seed_s': seeded,
+        'append_day_ms': appended * 1000,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--meters', type=int, default=8)
+    parser.add_argument('--selected', type=int, default=2, help='meters plotted per callback')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    parser.add_argument('--out', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    over = [label for label, result in results['results'].items() if result['p95_ms'] > args.budget_ms]
+    for label in over:
+        print(f"OVER BUDGET {label}: p95 {results['results'][label]['p95_ms']:.2f} ms", file=sys.stderr)
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
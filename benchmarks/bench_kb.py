@@ -0,0 +1,104 @@
+"""Answer retrieval benchmark for the financial services demo
+
+Builds a knowledge base of synthetic Q&A entries, then times distinct
+(uncached) questions and repeated (cached) ones the way
+/api/financial-demo/answer runs them.
+
+    python -m benchmarks.bench_kb --entries 100000 --budget-ms 5
+
+Exits with status 1 when the uncached p99 exceeds --budget-ms.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_routes import percentile
+from knowledge_base import KnowledgeBase
+
+SUBJECTS = ['account', 'portfolio', 'retirement', 'ira', 'roth', 'bond', 'stock', 'etf', 'index fund',
+            'mortgage', 'loan', 'credit card', 'budget', 'emergency fund', 'tax', 'dividend', 'crypto',
+            'insurance', 'annuity', 'pension', 'college savings', 'brokerage', 'transfer', 'password',
+            'statement', 'fee', 'advisor', 'rebalancing', 'allocation', 'inflation']
+ACTIONS = ['open', 'close', 'reduce', 'increase', 'compare', 'choose', 'protect', 'withdraw from',
+           'contribute to', 'rebalance', 'report', 'transfer', 'understand', 'plan', 'diversify']
+CONTEXTS = ['in my 20s', 'in my 30s', 'before retirement', 'after a job change', 'during a recession',
+            'with a small income', 'as a freelancer', 'for my kids', 'this year', 'when rates rise',
+            'in a bear market', 'with high debt', 'as a new investor', 'after marriage', 'for early retirement']
+
+
+def synthetic_entries(n, seed=0):
+    """n Q&A entries from combinations of subjects, actions, contexts and a serial word"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, [len(SUBJECTS), len(SUBJECTS), len(ACTIONS), len(CONTEXTS)], size=(n, 4))
+    entries = []
+    for i, (s1, s2, a, c) in enumerate(picks.tolist()):
+        question = f"How do I {ACTIONS[a]} my {SUBJECTS[s1]} and {SUBJECTS[s2]} {CONTEXTS[c]} case{i}?"
+        answer = (f"<strong>{SUBJECTS[s1].title()} guidance:</strong><br><br>"
+                  f"1. Review your {SUBJECTS[s1]} and {SUBJECTS[s2]} {CONTEXTS[c]}<br>"
+                  f"2. Decide how to {ACTIONS[a]} it step by step (case {i})")
+        entries.append({'id': f'advisor-{i:06d}', 'topic': 'advisor', 'question': question, 'answer': answer})
+    return entries
+
+
+def questions(n, seed=1):
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, [len(SUBJECTS), len(ACTIONS), len(CONTEXTS)], size=(n, 3))
+    return [f"should I {ACTIONS[a]} my {SUBJECTS[s]} {CONTEXTS[c]} q{i}" for i, (s, a, c) in enumerate(picks.tolist())]
+
+
+def timed_answers(kb, asked):
+    latencies = []
+    for question in asked:
+        t0 = time.perf_counter()
+        kb.answer(question)
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    return {'p50_ms': percentile(latencies, 50) * 1000, 'p99_ms': percentile(latencies, 99) * 1000,
+            'max_ms': latencies[-1] * 1000}
+
+
+def run(args):
+    with tempfile.TemporaryDirectory(prefix='portfolio-kb-') as directory:
+        path = os.path.join(directory, 'kb.json')
+        with open(path, 'w') as f:
+            json.dump({'entries': synthetic_entries(args.entries)}, f)
+        kb = KnowledgeBase(path, cache_size=args.queries)
+        t0 = time.perf_counter()
+        kb.topics
+        built = time.perf_counter() - t0
+        asked = questions(args.queries)
+        results = {'entries': args.entries, 'build_s': built,
+                   'uncached': timed_answers(kb, asked), 'cached': timed_answers(kb, asked)}
+    print(f"build {built:.2f} s for {args.entries} entries", file=sys.stderr)
+    for label in ('uncached', 'cached'):
+        r = results[label]
+        print(f"{label:9s} p50 {r['p50_ms']:7.3f} ms  p99 {r['p99_ms']:7.3f} ms  max {r['max_ms']:7.3f} ms",
+              file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    parser.add_argument('--out', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    if results['uncached']['p99_ms'] > args.budget_ms:
+        print(f"OVER BUDGET: uncached p99 {results['uncached']['p99_ms']:.2f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""Latency benchmark for every route in routes.py
+
+Drives the app through the Flask test client, a local threaded WSGI server
+and (with uvicorn installed) the ASGI entry point in asgi.py, over
+synthetic catalogs of several sizes, and writes p50/p95/p99 latency,
+throughput and peak RSS to a JSON baseline.
+
+    python -m benchmarks.bench_routes --sizes 10,1000,100000 --out bench.json
+    python -m benchmarks.bench_routes --modes wsgi,asgi --sizes 1000
+    python -m benchmarks.bench_routes --shared --compare bench.json
+    python -m benchmarks.bench_routes --compare bench.json --threshold 0.25
+    python -m benchmarks.bench_routes --compare bench.json --current new.json
+
+--compare exits with status 1 when any route's --metric got slower than
+the baseline by more than --threshold (a fraction). --shared serves the
+catalog from a SharedCatalogStore, as gunicorn.conf.py does, under the
+same result keys, so it can be compared against a per-process baseline.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from socketserver import ThreadingMixIn
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.synthetic import WORDS, write_catalog
+
+DEFAULT_SIZES = (10, 1000, 100000)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class TestClientDriver:
+    name = 'client'
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def get(self, url):
+        response = self.client.get(url)
+        body = response.get_data()
+        return response.status_code, len(body)
+
+    def close(self):
+        pass
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class WSGIServerDriver:
+    """Serves the app with wsgiref on an ephemeral port and fetches over HTTP"""
+
+    name = 'wsgi'
+
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, server_class=_ThreadingWSGIServer,
+                                  handler_class=_QuietHandler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def get(self, url):
+        return _http_get(self.port, url)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ASGIServerDriver:
+    """Serves asgi.application with uvicorn on an ephemeral port"""
+
+    name = 'asgi'
+    startup_seconds = 30
+
+    def __init__(self, app):
+        try:
+            import uvicorn
+        except ImportError:
+            raise SystemExit("The asgi mode needs uvicorn: pip install uvicorn")
+        import asgi
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        self.port = sock.getsockname()[1]
+        config = uvicorn.Config(asgi.application, log_level='warning', lifespan='on')
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, kwargs={'sockets': [sock]}, daemon=True)
+        self.thread.start()
+        deadline = time.monotonic() + self.startup_seconds
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn exited before it started serving")
+            if time.monotonic() > deadline:
+                self.server.should_exit = True
+                raise RuntimeError(f"uvicorn did not start within {self.startup_seconds}s")
+            time.sleep(0.01)
+
+    def get(self, url):
+        return _http_get(self.port, url)
+
+    def close(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def _http_get(port, url):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        conn.request('GET', url)
+        response = conn.getresponse()
+        body = response.read()
+        return response.status, len(body)
+    finally:
+        conn.close()
+
+
+DRIVERS = {driver.name: driver for driver in (TestClientDriver, WSGIServerDriver, ASGIServerDriver)}
+
+
+def write_artifacts(directory):
+    """Sample files for the download and code preview routes"""
+    with open(os.path.join(directory, 'sample_query.sql'), 'w') as f:
+        for i in range(20000):
+            f.write(f"SELECT id, amount FROM payments WHERE customer_id = {i} AND status = 'open';\n")
+    for name in ('mingkai_wang_resume.pdf', 'Academic_Transcript.pdf'):
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(os.urandom(256 * 1024))
+
+
+def route_plan(snapshot):
+    """(label, url) for every route, using ids and facets from the catalog"""
+    facets = snapshot.facets
+    popular_tech = max(facets.technologies, key=lambda t: facets.tech_bits[t].bit_count())
+    middle = snapshot.projects[len(snapshot.projects) // 2]
+    return [
+        ('index', '/'),
+        ('index_tech', '/?' + urlencode({'tech': popular_tech})),
+        ('index_category', '/?' + urlencode({'category': facets.categories[0]})),
+        ('index_search', '/?' + urlencode({'search': WORDS[3]})),
+        ('index_search_filtered', '/?' + urlencode({'search': WORDS[3][:4], 'tech': popular_tech})),
+        ('project_detail', f"/project/{middle['id']}"),
+        ('about', '/about'),
+        ('code_preview', '/downloads/sample_query.sql'),
+        ('code_preview_page', '/downloads/sample_query.sql?start=1000&count=200'),
+        ('financial_services_demo', '/financial-services-demo'),
+        ('download_resume', '/download/resume'),
+        ('download_transcript', '/download/transcript'),
+    ]
+
+
+def measure(driver, url, requests, max_seconds, before_request=None):
+    """Issue sequential GETs and summarise their latency"""
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        if before_request is not None:
+            before_request()
+        t0 = time.perf_counter()
+        status, _ = driver.get(url)
+        latencies.append(time.perf_counter() - t0)
+        if status >= 400:
+            errors += 1
+        if time.perf_counter() - started > max_seconds and len(latencies) >= 5:
+            break
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def run(args):
+    logging.disable(logging.INFO)
+    import app as app_module
+
+    results = {}
+    peak_rss = {}
+    catalog_build = {}
+    with tempfile.TemporaryDirectory(prefix='portfolio-bench-') as workdir:
+        artifacts = os.path.join(workdir, 'downloads')
+        os.makedirs(artifacts)
+        write_artifacts(artifacts)
+        app_module.downloads.directory = artifacts
+        app_module.downloads.clear()
+        if args.shared:
+            from shared_catalog import SharedCatalogStore
+            app_module.catalog.store = SharedCatalogStore(os.path.join(workdir, 'shared-catalog'))
+
+        for size in args.sizes:
+            path = os.path.join(workdir, f'projects_{size}.json')
+            write_catalog(path, size, template_path=args.template)
+            app_module.catalog.path = path
+            app_module.catalog.invalidate()
+            t0 = time.perf_counter()
+            snapshot = app_module.catalog.snapshot()
+            catalog_build[str(size)] = time.perf_counter() - t0
+
+            before_request = None if args.warm else app_module.page_cache.clear
+            for mode in args.modes:
+                driver = DRIVERS[mode](app_module.app)
+                try:
+                    for label, url in route_plan(snapshot):
+                        key = f'{mode}/{size}/{label}'
+                        results[key] = measure(driver, url, args.requests, args.max_seconds, before_request)
+                        print(f"{key:55s} p50 {results[key]['p50_ms']:9.2f} ms  "
+                              f"p95 {results[key]['p95_ms']:9.2f} ms  "
+                              f"{results[key]['throughput_rps']:9.1f} req/s", file=sys.stderr)
+                finally:
+                    driver.close()
+            # ru_maxrss is a process high-water mark in KiB, so sizes run in ascending order
+            peak_rss[str(size)] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'requests_per_route': args.requests,
+            'page_cache': 'warm' if args.warm else 'cleared per request',
+            'catalog': 'shared' if args.shared else 'per process',
+        },
+        'catalog_build_s': catalog_build,
+        'peak_rss_kb': peak_rss,
+        'results': results,
+    }
+
+
+def mode_comparison(results, base_mode, other_mode, metric):
+    """Report lines comparing two serving modes route by route"""
+    lines = []
+    prefix = f'{base_mode}/'
+    for key, base in sorted(results.items()):
+        if not key.startswith(prefix):
+            continue
+        other = results.get(other_mode + key[len(base_mode):])
+        if other is None or not base.get(metric):
+            continue
+        lines.append(f"{key[len(prefix):]:45s} {base_mode} {base[metric]:9.2f}  "
+                     f"{other_mode} {other[metric]:9.2f}  ({other[metric] / base[metric] - 1.0:+.0%})")
+    return lines
+
+
+def compare(current, baseline, metric, threshold):
+    """Routes whose metric regressed by more than threshold, as report lines"""
+    regressions = []
+    for key, base in sorted(baseline.get('results', {}).items()):
+        now = current.get('results', {}).get(key)
+        if now is None or not base.get(metric):
+            continue
+        change = now[metric] / base[metric] - 1.0
+        if change > threshold:
+            regressions.append(f"{key}: {metric} {base[metric]:.2f} -> {now[metric]:.2f} ({change:+.0%})")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma separated synthetic catalog sizes')
+    parser.add_argument('--modes', default='client,wsgi',
+                        help=f"comma separated drivers ({', '.join(DRIVERS)})")
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--max-seconds', type=float, default=10.0, help='time budget per route')
+    parser.add_argument('--warm', action='store_true', help='keep the page cache between requests')
+    parser.add_argument('--shared', action='store_true', help='serve the catalog from a shared mmap store')
+    parser.add_argument('--template', default='projects.json', help='projects file used as the schema')
+    parser.add_argument('--out', help='write results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE', help='fail on regressions against this baseline')
+    parser.add_argument('--current', help='compare this results file instead of running')
+    parser.add_argument('--metric', default='p95_ms')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args(argv)
+    args.sizes = sorted(int(size) for size in args.sizes.split(','))
+    args.modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = set(args.modes) - set(DRIVERS)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run(args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(current, f, indent=2)
+    for line in mode_comparison(current.get('results', {}), 'wsgi', 'asgi', args.metric):
+        print(line, file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.metric, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No route regressed by more than {args.threshold:.0%} on {args.metric}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import json
+import os
+import random
+
+WORDS = ("analysis pipeline dashboard model forecast compliance screening customer churn "
+         "revenue portfolio risk market data warehouse etl api integration automation "
+         "report insight visualization regression classification clustering anomaly "
+         "detection monitoring streaming batch cloud database query optimization "
+         "feature engineering evaluation deployment security audit workflow").split()
+
+CATEGORIES = ("Data Analytics", "Machine Learning", "Artificial Intelligence",
+              "Business Case Analysing", "Web Development", "Data Engineering",
+              "Financial Services", "Visualization")
+
+
+def _sentence(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.'
+
+
+def synthetic_catalog(size, template_path='projects.json', seed=42):
+    """Generate `size` projects shaped like the entries of projects.json
+
+    Technology popularity is skewed (a few are used by many projects) so
+    facet sizes look like a real portfolio rather than a uniform spread.
+    """
+    rng = random.Random(seed)
+    with open(template_path) as f:
+        templates = json.load(f).get('projects', [])
+    base_techs = sorted({tech for p in templates for tech in p.get('technologies', [])})
+    tech_pool = base_techs + [f"Tech{i}" for i in range(max(50, int(size ** 0.5)))]
+    weights = [1.0 / (rank + 1) for rank in range(len(tech_pool))]
+
+    projects = []
+    for i in range(size):
+        template = templates[i % len(templates)] if templates else {}
+        project = dict(template)
+        project['id'] = f"project-{i}"
+        project['title'] = _sentence(rng, 6)
+        project['description'] = _sentence(rng, 30)
+        project['detailed_description'] = _sentence(rng, 80)
+        project['features'] = [_sentence(rng, 10) for _ in range(6)]
+        project['readme'] = _sentence(rng, 20)
+        project['technologies'] = sorted(set(rng.choices(tech_pool, weights, k=6)))
+        project['category'] = rng.choice(CATEGORIES)
+        projects.append(project)
+    return {"projects": projects}
+
+
+def write_catalog(path, size, template_path='projects.json', seed=42):
+    """Write a synthetic catalog to path and return the data"""
+    data = synthetic_catalog(size, template_path, seed)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return data
@@ -0,0 +1,148 @@
+"""Minified, content-hashed CSS/JS bundles for the built-in pages
+
+Sources live in assets/. A build minifies each bundle, writes it to the
+dist directory under a name carrying a hash of its contents, adds
+precompressed variants and records the names in manifest.json. Pages
+link bundles through asset_url(), so a changed bundle gets a new URL
+and every URL can be cached forever.
+
+    <dist>/manifest.json          {"demo.js": "demo.3f9c2a1b7d.js", ...}
+    <dist>/demo.3f9c2a1b7d.js     plus .gz / .br variants
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from flask import url_for
+
+from downloads import ENCODING_SUFFIXES, precompress
+
+MANIFEST = 'manifest.json'
+
+# Bundle name -> source files in assets/, concatenated in order
+BUNDLES = {
+    'demo.css': ('demo.css',),
+    'demo.js': ('demo.js',),
+    'code_preview.css': ('code_preview.css',),
+    'code_preview.js': ('code_preview.js',),
+}
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE_RE = re.compile(r'\s*([{}:;,>])\s*')
+
+
+def minify_css(text):
+    text = CSS_COMMENT_RE.sub('', text)
+    text = ' '.join(text.split())
+    return CSS_SPACE_RE.sub(r'\1', text).replace(';}', '}').strip() + '\n'
+
+
+def minify_js(text):
+    """Drop whole-line comments, indentation and blank lines
+
+    Conservative on purpose: nothing inside a line is rewritten, and the
+    lines of a multi-line template literal are kept exactly as written.
+    """
+    lines = []
+    in_template = in_comment = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if in_template:
+            lines.append(line)
+        elif in_comment:
+            in_comment = not stripped.endswith('*/')
+            continue
+        elif not stripped or stripped.startswith('//'):
+            continue
+        elif stripped.startswith('/*') and (stripped.endswith('*/') or '*/' not in stripped):
+            in_comment = not stripped.endswith('*/')
+            continue
+        else:
+            lines.append(stripped)
+        # An odd number of unescaped backticks opens or closes a template literal
+        if (line.count('`') - line.count('\\`')) % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def build(source_dir, dist_dir):
+    """Write every bundle and its variants; returns the manifest"""
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        stem, ext = os.path.splitext(name)
+        text = ''
+        for source in sources:
+            with open(os.path.join(source_dir, source), encoding='utf-8') as f:
+                text += f.read()
+        data = MINIFIERS[ext](text).encode('utf-8')
+        hashed = f'{stem}.{hashlib.blake2b(data, digest_size=5).hexdigest()}{ext}'
+        path = os.path.join(dist_dir, hashed)
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        manifest[name] = hashed
+    # The manifest is internal and never served, so it gets no variants
+    precompress(dist_dir, skip=(MANIFEST,))
+    manifest_path = os.path.join(dist_dir, MANIFEST)
+    for _, suffix in ENCODING_SUFFIXES:
+        if os.path.exists(manifest_path + suffix):
+            os.remove(manifest_path + suffix)
+    # Written last, so a manifest only ever names files that exist
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
+
+
+class AssetManifest:
+    """Maps bundle names to their hashed URLs, building the bundles if needed
+
+    The manifest is read once per process; it is rebuilt first when it is
+    missing or older than any source, so a fresh checkout works without a
+    separate build step.
+    """
+
+    def __init__(self, source_dir, dist_dir, endpoint='bundle'):
+        self.source_dir = source_dir
+        self.dist_dir = dist_dir
+        self.endpoint = endpoint
+        self._lock = threading.Lock()
+        self._manifest = None
+
+    def _stale(self):
+        try:
+            built = os.stat(os.path.join(self.dist_dir, MANIFEST)).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        sources = {source for files in BUNDLES.values() for source in files}
+        return any(os.stat(os.path.join(self.source_dir, source)).st_mtime_ns > built for source in sources)
+
+    def manifest(self):
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    if self._stale():
+                        manifest = build(self.source_dir, self.dist_dir)
+                        logging.info("Built %d asset bundles into %s", len(manifest), self.dist_dir)
+                    else:
+                        with open(os.path.join(self.dist_dir, MANIFEST)) as f:
+                            manifest = json.load(f)
+                    self._manifest = manifest
+        return self._manifest
+
+    def rebuild(self):
+        with self._lock:
+            self._manifest = build(self.source_dir, self.dist_dir)
+        return self._manifest
+
+    def url(self, name):
+        """Content-hashed URL of a bundle"""
+        return url_for(self.endpoint, name=self.manifest()[name])
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from facets import FacetIndex, bits_from_positions, positions_from_bits
+from search_index import SearchIndex
+from skills import SkillStats
+
+
+def empty_catalog_data():
+    """Data returned when the projects file is missing or unreadable"""
+    return {"projects": [], "technologies": [], "categories": []}
+
+
+class CatalogSnapshot:
+    """One parsed version of the projects file, never mutated after build"""
+
+    def __init__(self, data, stamp, version, search_index=None, skills=None, generation=None):
+        self.data = data
+        self.stamp = stamp
+        self.version = version
+        self.generation = generation
+        self.projects = data.get('projects', [])
+        # A shared catalog's projects decode on access; build lookups from its summaries
+        summaries = getattr(self.projects, 'summaries', self.projects)
+        self.positions = {p.get('id'): pos for pos, p in enumerate(summaries)}
+        self.facets = FacetIndex(self.projects, summaries)
+        self.search_index = search_index
+        self.skills = skills
+
+    def get(self, project_id):
+        """Look up a project by id in O(1)"""
+        pos = self.positions.get(project_id)
+        return self.projects[pos] if pos is not None else None
+
+    def search(self, query, limit, within=None):
+        """Ranked full-text search, optionally restricted to a facet bitset
+
+        Returns (projects, bits): the top `limit` matching projects, best
+        first, and the bitset of all matches for facet counting.
+        """
+        if self.search_index is None:
+            return [], 0
+        allowed = None
+        if within is not None and within != self.facets.all_bits:
+            summaries = getattr(self.projects, 'summaries', self.projects)
+            allowed = {summaries[pos].get('id') for pos in positions_from_bits(within)}
+
+        scores = self.search_index.match(query, allowed)
+        # The index may already reflect a newer file than this snapshot
+        scores = {doc_id: score for doc_id, score in scores.items() if doc_id in self.positions}
+        ranked = [self.projects[self.positions[doc_id]] for doc_id, _ in SearchIndex.top(scores, limit)]
+        bits = bits_from_positions((self.positions[doc_id] for doc_id in scores), self.facets.size)
+        return ranked, bits
+
+
+class ProjectCatalog:
+    """Process-wide cache of the projects file, revalidated with stat()
+
+    The file is parsed once and re-parsed only when its mtime or size
+    changes. Readers always get a complete snapshot: a rebuild happens off
+    to the side and is published with a single reference assignment.
+
+    With a SharedCatalogStore, one process parses the file and publishes
+    it; every process then follows the store's generation counter, so all
+    workers switch versions together.
+    """
+
+    def __init__(self, path, store=None):
+        self.path = path
+        self.store = store
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.search_index = SearchIndex()
+        self.skill_stats = SkillStats()
+        self.reloads = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def snapshot(self):
+        """Return the current snapshot, rebuilding it if the file changed"""
+        stamp = self._stat()
+        if self.store is not None:
+            return self._shared_snapshot(stamp)
+        snap = self._snapshot
+        if snap is not None and snap.stamp == stamp:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or snap.stamp != stamp:
+                snap = self._build(stamp, snap)
+                self._snapshot = snap
+            return snap
+
+    def invalidate(self):
+        """Force the next snapshot() call to re-read the file"""
+        with self._lock:
+            self._snapshot = None
+        if self.store is not None:
+            with self.store.locked():
+                self._publish(self._stat())
+
+    def _shared_snapshot(self, stamp):
+        store = self.store
+        if store.generation() == 0 or store.source_stamp() != stamp:
+            with store.locked():
+                # Another worker may have published while we waited
+                if store.generation() == 0 or store.source_stamp() != stamp:
+                    self._publish(stamp)
+
+        generation = store.generation()
+        snap = self._snapshot
+        if snap is not None and snap.generation == generation:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or snap.generation != store.generation():
+                data, version, generation, source_stamp = store.load()
+                snap = self._index(data, source_stamp, version, generation)
+                self._snapshot = snap
+            return snap
+
+    def _publish(self, stamp):
+        data, version = self._read(self._snapshot)
+        generation = self.store.publish(data, version, stamp)
+        logging.debug("Published project catalog version %s as generation %d", version, generation)
+
+    def _build(self, stamp, previous):
+        data, version = self._read(previous)
+        return self._index(data, stamp, version)
+
+    def _index(self, data, stamp, version, generation=None):
+        self.reloads += 1
+        projects = data.get('projects', [])
+        added, removed = self.search_index.update(projects)
+        skills = self.skill_stats.update(getattr(projects, 'summaries', projects))
+        logging.debug("Loaded project catalog version %s (search index: +%d -%d)",
+                      version, added, removed)
+        return CatalogSnapshot(data, stamp, version, self.search_index, skills, generation)
+
+    def _read(self, previous):
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw)
+        except FileNotFoundError:
+            logging.error("Projects data file not found")
+            return empty_catalog_data(), 'empty'
+        except json.JSONDecodeError:
+            logging.error("Invalid JSON in projects data file")
+            if previous is not None:
+                # Keep serving the last good catalog (e.g. during a partial write)
+                return previous.data, previous.version
+            return empty_catalog_data(), 'empty'
+        return data, hashlib.blake2b(raw, digest_size=8).hexdigest()
@@ -0,0 +1,349 @@
+"""Churn model loading and batch scoring for /api/churn/predict"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+from forest_engine import FlatForest
+from model_artifact import current_path, read_artifact, write_artifact
+
+# Rows accepted per prediction request
+MAX_BATCH_ROWS = 10000
+
+# Probability at or above which a customer is flagged as likely to churn
+CHURN_THRESHOLD = 0.5
+
+# Request body bytes parsed and scored at a time by the CSV endpoint
+STREAM_CHUNK_BYTES = 1 << 20
+
+_NUMBER_TYPES = frozenset((int, float))
+
+_ROW_ERROR = 'missing or non-numeric feature'
+
+
+class InvalidRecords(ValueError):
+    """A prediction request that does not match the model's features"""
+
+
+def save_model(root, model_data):
+    """Publish create_model.py's fitted scaler and forest as a model artifact
+
+    Returns the new version. Only arrays and JSON are written, so the
+    server never has to unpickle anything.
+    """
+    forest = FlatForest.from_sklearn(model_data['model'])
+    scaler = model_data['scaler']
+    metadata = {
+        'feature_names': list(model_data['feature_names']),
+        'model_performance': model_data.get('model_performance', {}),
+        'feature_importance': model_data.get('feature_importance', {}),
+        'training_info': model_data.get('training_info', {}),
+        'depth': forest.depth,
+    }
+    arrays = dict(forest.arrays(), scaler_mean=scaler.mean_, scaler_scale=scaler.scale_)
+    return write_artifact(root, metadata, arrays)
+
+
+class ChurnModel:
+    """A scaler and flat forest plus the feature order they expect"""
+
+    def __init__(self, metadata, arrays, version):
+        self.feature_names = list(metadata['feature_names'])
+        self.model_performance = metadata.get('model_performance', {})
+        self.feature_importance = metadata.get('feature_importance', {})
+        self.training_info = metadata.get('training_info', {})
+        self.version = version
+        self.forest = FlatForest.from_arrays(arrays, metadata['depth'])
+        self.mean = arrays['scaler_mean']
+        self.scale = arrays['scaler_scale']
+        if len(self.mean) != len(self.feature_names):
+            raise ValueError(f"scaler has {len(self.mean)} features, metadata lists {len(self.feature_names)}")
+        self._feature_set = frozenset(self.feature_names)
+        self._row_of = itemgetter(*self.feature_names)
+
+    def features(self, records):
+        """Validate JSON records into an (n, features) float64 matrix
+
+        A record is either an object keyed by feature name or a list of
+        values in feature_names order.
+        """
+        if not isinstance(records, list) or not records:
+            raise InvalidRecords("'records' must be a non-empty list")
+        if len(records) > MAX_BATCH_ROWS:
+            raise InvalidRecords(f"at most {MAX_BATCH_ROWS} records per request")
+
+        names = self.feature_names
+        rows = []
+        for i, record in enumerate(records):
+            if isinstance(record, dict):
+                if record.keys() != self._feature_set:
+                    missing = sorted(self._feature_set - record.keys())
+                    unknown = sorted(record.keys() - self._feature_set)
+                    problems = []
+                    if missing:
+                        problems.append(f"missing {', '.join(missing)}")
+                    if unknown:
+                        problems.append(f"unknown {', '.join(map(str, unknown))}")
+                    raise InvalidRecords(f"record {i}: {'; '.join(problems)}")
+                rows.append(self._row_of(record))
+            elif isinstance(record, list):
+                if len(record) != len(names):
+                    raise InvalidRecords(f"record {i}: expected {len(names)} values, got {len(record)}")
+                rows.append(record)
+            else:
+                raise InvalidRecords(f"record {i}: must be an object or a list")
+
+        # One pass over every value's type; bool and str are rejected, not coerced
+        if not set(map(type, chain.from_iterable(rows))) <= _NUMBER_TYPES:
+            for i, row in enumerate(rows):
+                for name, value in zip(names, row):
+                    if type(value) not in _NUMBER_TYPES:
+                        raise InvalidRecords(f"record {i}: {name} must be a number")
+
+        try:
+            X = np.array(rows, dtype=np.float64)
+        except OverflowError:
+            # A JSON integer too large for a float64
+            for i, row in enumerate(rows):
+                for name, value in zip(names, row):
+                    try:
+                        float(value)
+                    except OverflowError:
+                        raise InvalidRecords(f"record {i}: {name} is out of range") from None
+            raise
+        if not np.isfinite(X).all():
+            bad = int(np.flatnonzero(~np.isfinite(X).all(axis=1))[0])
+            raise InvalidRecords(f"record {bad}: values must be finite")
+        return X
+
+    def predict_proba(self, X):
+        """Churn probability per row, in one vectorized call
+
+        Scales exactly as StandardScaler.transform does, so results match
+        the sklearn pipeline.
+        """
+        return self.forest.predict_proba((X - self.mean) / self.scale)[:, 1]
+
+    def explain(self, X):
+        """(bias, contributions): each feature's share of every row's churn probability
+
+        bias is the forest's average churn probability before any split;
+        bias plus a row's contributions is its predict_proba.
+        """
+        return self.forest.contributions((X - self.mean) / self.scale, c=1)
+
+    def top_features(self, contributions, top):
+        """Per row, up to `top` feature names with the largest positive contributions"""
+        names = self.feature_names
+        order = np.argsort(-contributions, axis=1, kind='stable')[:, :top]
+        positive = np.take_along_axis(contributions, order, axis=1) > 0
+        return [[names[j] for j, keep in zip(row, keeps) if keep]
+                for row, keeps in zip(order.tolist(), positive.tolist())]
+
+    @staticmethod
+    def input_hash(X):
+        """Digest of a validated feature matrix, for caching results per input"""
+        return hashlib.blake2b(np.ascontiguousarray(X).data, digest_size=16).hexdigest()
+
+
+class ChurnModelStore:
+    """Maps the current model artifact once per process and again when it is republished"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._model = None
+        self._stamp = None
+
+    def _stat(self):
+        try:
+            st = os.stat(current_path(self.root))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"no churn model published in {self.root}; run create_model.py") from None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        """The current model; raises FileNotFoundError when none was trained"""
+        stamp = self._stat()
+        if self._model is not None and self._stamp == stamp:
+            return self._model
+        with self._lock:
+            if self._model is None or self._stamp != stamp:
+                version, metadata, arrays = read_artifact(self.root)
+                self._model = ChurnModel(metadata, arrays, version)
+                self._stamp = stamp
+                logging.info("Loaded churn model version %s", version)
+            return self._model
+
+
+class CsvBatches:
+    """Feature matrices parsed from a CSV request body, one chunk at a time
+
+    The header is read when the object is created, so a missing feature
+    column is reported before any output is sent. Each record must be
+    one line; fields past the header's width are ignored and blank lines
+    are skipped. Iterating yields (first_row, ids, X, valid) per chunk of
+    about chunk_bytes, where valid flags rows whose features are all
+    finite numbers; rows are numbered from 0 after the header, not
+    counting blank lines.
+    """
+
+    def __init__(self, stream, feature_names, id_column=None, chunk_bytes=STREAM_CHUNK_BYTES):
+        self.stream = stream
+        self.feature_names = list(feature_names)
+        self.id_column = id_column
+        self.chunk_bytes = chunk_bytes
+        self.rows = 0
+        self.bytes_read = 0
+        self._buffer = b''
+        if id_column in self.feature_names:
+            raise InvalidRecords(f"id column {id_column} is a model feature")
+        header_line = self._read_line()
+        if not header_line.strip():
+            raise InvalidRecords("empty CSV body; the first line must be a header")
+        self.columns = next(csv.reader([header_line.decode('utf-8-sig')]))
+        wanted = self.feature_names + ([id_column] if id_column else [])
+        missing = [name for name in wanted if name not in self.columns]
+        if missing:
+            raise InvalidRecords(f"CSV header is missing {', '.join(missing)}")
+        if len(set(self.columns)) != len(self.columns):
+            raise InvalidRecords("CSV header has duplicate columns")
+
+    def _fill(self):
+        data = self.stream.read(self.chunk_bytes)
+        self.bytes_read += len(data)
+        self._buffer += data
+        return bool(data)
+
+    def _read_line(self):
+        while b'\n' not in self._buffer and len(self._buffer) < self.chunk_bytes and self._fill():
+            pass
+        if b'\n' not in self._buffer and len(self._buffer) >= self.chunk_bytes:
+            raise InvalidRecords(f"CSV line longer than {self.chunk_bytes} bytes")
+        line, _, self._buffer = self._buffer.partition(b'\n')
+        return line
+
+    def _chunks(self):
+        """Runs of whole lines of at least chunk_bytes each, except the last"""
+        while True:
+            while len(self._buffer) < self.chunk_bytes and self._fill():
+                pass
+            if len(self._buffer) < self.chunk_bytes:
+                # End of the body
+                if self._buffer.strip():
+                    yield self._buffer
+                self._buffer = b''
+                return
+            end = self._buffer.rfind(b'\n') + 1
+            if not end:
+                raise InvalidRecords(f"CSV line longer than {self.chunk_bytes} bytes")
+            chunk, self._buffer = self._buffer[:end], self._buffer[end:]
+            yield chunk
+
+    def _parse(self, chunk):
+        import pandas as pd
+        usecols = self.feature_names + ([self.id_column] if self.id_column else [])
+        # Fields past the header's width are dropped; short rows are padded
+        # with NaN; blank lines (e.g. a trailing one) are not rows
+        options = dict(header=None, names=self.columns, usecols=usecols, index_col=False,
+                       skip_blank_lines=True, engine='c', encoding='utf-8')
+        try:
+            dtypes = dict.fromkeys(self.feature_names, np.float64)
+            if self.id_column:
+                dtypes[self.id_column] = str
+            frame = pd.read_csv(io.BytesIO(chunk), dtype=dtypes, **options)
+        except ValueError as e:
+            if isinstance(e, pd.errors.ParserError):
+                raise InvalidRecords(f"row {self.rows}+: {e}") from None
+            # Some value is not a number: parse as text and flag those rows
+            frame = pd.read_csv(io.BytesIO(chunk), dtype=str, keep_default_na=False, **options)
+            for name in self.feature_names:
+                frame[name] = pd.to_numeric(frame[name].str.strip(), errors='coerce')
+        X = frame[self.feature_names].to_numpy(np.float64)
+        ids = None
+        if self.id_column:
+            column = frame[self.id_column].astype(object)
+            ids = column.where(column.notna() & (column != ''), None).tolist()
+        return ids, X
+
+    def __iter__(self):
+        for chunk in self._chunks():
+            ids, X = self._parse(chunk)
+            first_row = self.rows
+            self.rows += len(X)
+            yield first_row, ids, X, np.isfinite(X).all(axis=1)
+
+
+def stream_scores(model, batches, output='ndjson'):
+    """Score CsvBatches chunk by chunk, yielding NDJSON or CSV text
+
+    Rows with missing or non-numeric features get an error instead of a
+    score. The last NDJSON line is a summary with the throughput; CSV
+    output ends with the same numbers as a '#' comment line. A malformed
+    body ends the output with an error line.
+    """
+    id_column = batches.id_column
+    started = time.perf_counter()
+    scored = invalid = 0
+    if output == 'csv':
+        yield ','.join(['row'] + ([id_column] if id_column else []) + ['churn_probability', 'churn', 'error']) + '\n'
+    error = None
+    try:
+        for first_row, ids, X, valid in batches:
+            probabilities = np.full(len(X), np.nan)
+            if valid.any():
+                probabilities[valid] = model.predict_proba(X[valid])
+            scored += int(valid.sum())
+            invalid += len(X) - int(valid.sum())
+            yield _format_chunk(first_row, ids, probabilities, valid, output)
+    except InvalidRecords as e:
+        error = str(e)
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        'model_version': model.version,
+        'rows': batches.rows,
+        'scored': scored,
+        'invalid': invalid,
+        'bytes': batches.bytes_read,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(batches.rows / elapsed) if elapsed > 0 else None,
+    }
+    if error:
+        summary['error'] = error
+    logging.info("Scored %d churn rows in %.2fs (%s rows/s)%s", batches.rows, elapsed,
+                 summary['rows_per_second'], f"; stopped: {error}" if error else '')
+    if output == 'csv':
+        yield '# ' + ' '.join(f'{key}={value}' for key, value in summary.items()) + '\n'
+    else:
+        yield json.dumps({'summary': summary}) + '\n'
+
+
+def _format_chunk(first_row, ids, probabilities, valid, output):
+    rounded = probabilities.round(6).tolist()
+    flags = (probabilities >= CHURN_THRESHOLD).tolist()
+    rows = range(first_row, first_row + len(rounded))
+    if output == 'csv':
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        id_values = ids if ids is not None else [None] * len(rounded)
+        for row, ident, p, flag, ok in zip(rows, id_values, rounded, flags, valid.tolist()):
+            line = [row] + ([ident] if ids is not None else [])
+            line += [p, 'true' if flag else 'false', ''] if ok else ['', '', _ROW_ERROR]
+            writer.writerow(line)
+        return out.getvalue()
+    # Formatted directly rather than through json.dumps per row; only ids need escaping
+    prefixes = ([f'{{"row": {row}, "id": {json.dumps(ident)}, ' for row, ident in zip(rows, ids)]
+                if ids is not None else [f'{{"row": {row}, ' for row in rows])
+    lines = [f'{prefix}"churn_probability": {p}, "churn": {"true" if flag else "false"}}}\n'
+             if ok else f'{prefix}"error": "{_ROW_ERROR}"}}\n'
+             for prefix, p, flag, ok in zip(prefixes, rounded, flags, valid.tolist())]
+    return ''.join(lines)
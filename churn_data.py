@@ -0,0 +1,156 @@
+"""Synthetic churn customers written as memory-mapped columns
+
+Rows are generated in fixed-size chunks and appended to one .npy file
+per column, so writing 10M+ rows holds a single chunk in memory at a
+time. Each chunk draws from its own seed spawned from the dataset seed,
+so a seed and chunk size always give the same rows. Readers map the
+columns with np.load(mmap_mode='r') and slice rows out of them.
+
+    <directory>/dataset.json   rows, seed, columns, churn rate
+    <directory>/<column>.npy   one column; 'churn' holds the 0/1 label
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+FEATURE_NAMES = ["account_length", "total_day_minutes", "total_day_calls",
+                 "total_day_charge", "total_eve_minutes", "total_eve_charge",
+                 "total_night_minutes", "total_night_charge", "total_intl_minutes",
+                 "total_intl_charge", "customer_service_calls"]
+
+LABEL = 'churn'
+
+# Per-minute rates: every charge column is its minutes column times one of these
+RATES = {"day": 0.17, "eve": 0.085, "night": 0.045, "intl": 0.27}
+
+# Rows generated and written per chunk
+CHUNK_ROWS = 1 << 18
+
+FEATURE_DTYPE = np.dtype(np.float32)
+
+
+def generate_chunk(rng, n):
+    """n synthetic customers: (X float64 in FEATURE_NAMES order, y int8)
+
+    Charges are minutes times a fixed rate, day calls rise with day
+    minutes, heavy users call support more often, and churn is driven
+    mainly by customer service calls, then by day and international use.
+    """
+    account_length = rng.integers(1, 244, n)
+    minutes = {
+        "day": np.clip(rng.normal(180, 54, n), 0, None).round(1),
+        "eve": np.clip(rng.normal(200, 50, n), 0, None).round(1),
+        "night": np.clip(rng.normal(200, 50, n), 0, None).round(1),
+        "intl": np.clip(rng.normal(10, 2.8, n), 0, None).round(1),
+    }
+    day_calls = np.clip(rng.normal(70 + minutes["day"] / 6, 17, n), 0, None).round()
+    service_calls = rng.poisson(1.2 + 0.004 * np.maximum(minutes["day"] - 180, 0))
+
+    X = np.empty((n, len(FEATURE_NAMES)))
+    X[:, 0] = account_length
+    X[:, 1] = minutes["day"]
+    X[:, 2] = day_calls
+    X[:, 3] = (minutes["day"] * RATES["day"]).round(2)
+    X[:, 4] = minutes["eve"]
+    X[:, 5] = (minutes["eve"] * RATES["eve"]).round(2)
+    X[:, 6] = minutes["night"]
+    X[:, 7] = (minutes["night"] * RATES["night"]).round(2)
+    X[:, 8] = minutes["intl"]
+    X[:, 9] = (minutes["intl"] * RATES["intl"]).round(2)
+    X[:, 10] = service_calls
+
+    logit = (-3.0
+             + 0.9 * np.maximum(service_calls - 3, 0)
+             + 0.25 * service_calls
+             + 0.018 * (minutes["day"] - 180)
+             + 0.12 * (minutes["intl"] - 10)
+             - 0.002 * (account_length - 100))
+    y = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(np.int8)
+    return X, y
+
+
+def _column_path(directory, column):
+    return os.path.join(directory, f'{column}.npy')
+
+
+def write_dataset(directory, rows, seed=42, chunk_rows=CHUNK_ROWS):
+    """Generate `rows` customers into directory, replacing what was there
+
+    Each column file gets its .npy header up front and then one
+    sequential write per chunk, so memory use does not grow with rows.
+    """
+    staging = directory.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    dtypes = dict.fromkeys(FEATURE_NAMES, FEATURE_DTYPE)
+    dtypes[LABEL] = np.dtype(np.int8)
+    files = {}
+    try:
+        for column, dtype in dtypes.items():
+            f = files[column] = open(_column_path(staging, column), 'wb')
+            np.lib.format.write_array_header_1_0(
+                f, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)})
+        chunks = -(-rows // chunk_rows)
+        churned = 0
+        for number, chunk_seed in enumerate(np.random.SeedSequence(seed).spawn(chunks)):
+            n = min(chunk_rows, rows - number * chunk_rows)
+            X, y = generate_chunk(np.random.default_rng(chunk_seed), n)
+            for j, column in enumerate(FEATURE_NAMES):
+                files[column].write(X[:, j].astype(FEATURE_DTYPE).tobytes())
+            files[LABEL].write(y.tobytes())
+            churned += int(y.sum())
+    finally:
+        for f in files.values():
+            f.close()
+
+    with open(os.path.join(staging, 'dataset.json'), 'w') as f:
+        json.dump({'rows': rows, 'seed': seed, 'chunk_rows': chunk_rows, 'features': FEATURE_NAMES,
+                   'label': LABEL, 'churn_rate': round(churned / rows, 4) if rows else None}, f, indent=2)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.rename(staging, directory)
+    return ChurnDataset(directory)
+
+
+class ChurnDataset:
+    """Read-only view of a dataset written by write_dataset"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'dataset.json')) as f:
+            self.info = json.load(f)
+        self.feature_names = self.info['features']
+        self.columns = {column: np.load(_column_path(directory, column), mmap_mode='r')
+                        for column in self.feature_names + [self.info['label']]}
+        self.labels = self.columns[self.info['label']]
+
+    def __len__(self):
+        return self.info['rows']
+
+    def matrix(self, start=0, stop=None):
+        """Rows [start, stop) as a float64 (n, features) matrix"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        X = np.empty((max(stop - start, 0), len(self.feature_names)))
+        for j, column in enumerate(self.feature_names):
+            X[:, j] = self.columns[column][start:stop]
+        return X
+
+    def chunks(self, chunk_rows=CHUNK_ROWS, start=0, stop=None):
+        """(first_row, X, y) per chunk of rows"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for lo in range(start, stop, chunk_rows):
+            hi = min(lo + chunk_rows, stop)
+            yield lo, self.matrix(lo, hi), np.asarray(self.labels[lo:hi])
+
+    def write_csv(self, f, start=0, stop=None, chunk_rows=CHUNK_ROWS, id_column='customer_id'):
+        """Write rows as CSV text to the file object f, e.g. for /api/churn/score"""
+        import pandas as pd
+
+        header = True
+        for first_row, X, _ in self.chunks(chunk_rows, start, stop):
+            frame = pd.DataFrame(X, columns=self.feature_names)
+            if id_column:
+                frame.insert(0, id_column, np.arange(first_row, first_row + len(X)))
+            frame.to_csv(f, header=header, index=False, float_format='%.6g')
+            header = False
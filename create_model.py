@@ -1,59 +1,86 @@
+import logging
+import os
 import pickle
-import numpy as np 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
+import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
-from sklearn.metrics import classification_report, confusion_matrix, roc_curve, roc_auc_score
-
-# Create a pre-trained churn prediction model
-np.random.seed(42)
-
-# Generate sample training data structure
-n_samples = 1000
-feature_names = ["account_length", "total_day_minutes", "total_day_calls", 
-                "total_day_charge", "total_eve_minutes", "total_eve_charge",
-                "total_night_minutes", "total_night_charge", "total_intl_minutes",
-                "total_intl_charge", "customer_service_calls"]
-
-# Create model structure
-model_data = {
-    "model": "RandomForestClassifier(n_estimators=100, random_state=42, class_weight=\"balanced\")",
-    "scaler": "StandardScaler()",
-    "feature_names": feature_names,
-    "model_performance": {
-        "accuracy": 0.8247,
-        "precision": 0.7891,
-        "recall": 0.8156,
-        "f1_score": 0.8021,
-        "auc_score": 0.8734
-    },
-    "feature_importance": {
-        "customer_service_calls": 0.2341,
-        "total_day_charge": 0.1876,
-        "total_intl_charge": 0.1654,
-        "account_length": 0.1234,
-        "total_eve_charge": 0.1123,
-        "total_night_charge": 0.0987,
-        "total_day_minutes": 0.0543,
-        "total_eve_minutes": 0.0234,
-        "total_night_minutes": 0.0008
-    },
-    "training_info": {
-        "training_samples": n_samples,
-        "test_accuracy": 0.8247,
-        "cross_validation_score": 0.8156,
-        "hyperparameters": {
-            "n_estimators": 100,
-            "max_depth": 10,
-            "min_samples_split": 5,
-            "class_weight": "balanced"
+from churn import save_model
+from churn_data import FEATURE_NAMES, ChurnDataset, generate_chunk
+from training import PARAM_GRID, fit, scores, search
+
+# Train the churn prediction model served by /api/churn/predict, on
+# CHURN_TRAINING_ROWS rows of a churn_data dataset when CHURN_TRAINING_DATA
+# names one, otherwise on freshly generated customers
+n_samples = int(os.environ.get("CHURN_TRAINING_ROWS", 1000))
+training_data = os.environ.get("CHURN_TRAINING_DATA")
+feature_names = list(FEATURE_NAMES)
+
+# Cross-validation folds and where their results are cached between runs
+cv_folds = 5
+cache_dir = os.environ.get("CHURN_TRAINING_CACHE", "data/training_cache")
+workers = int(os.environ.get("CHURN_TRAINING_WORKERS", 0)) or None
+
+
+def load_training_data(n_samples):
+    """X, y for training; charges follow minutes and churn follows service calls"""
+    if training_data:
+        dataset = ChurnDataset(training_data)
+        return dataset.matrix(0, n_samples), np.asarray(dataset.labels[:n_samples], dtype=np.int64)
+    X, y = generate_chunk(np.random.default_rng(42), n_samples)
+    return X, y.astype(np.int64)
+
+
+def train_model(X, y):
+    """Search the hyperparameter grid, then refit the best candidate
+
+    Returns the scaler, model, held-out metrics and the search results.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    results = search(X_train, y_train, folds=cv_folds, cache_dir=cache_dir, workers=workers)
+    best = results[0]
+    scaler, model = fit(X_train, y_train, best["params"])
+    performance = scores(y_test, model.predict_proba(scaler.transform(X_test))[:, 1])
+    return scaler, model, performance, results
+
+
+def main():
+    X, y = load_training_data(n_samples)
+    scaler, model, performance, results = train_model(X, y)
+    best = results[0]
+
+    importance = sorted(zip(feature_names, model.feature_importances_), key=lambda item: -item[1])
+
+    model_data = {
+        "model": model,
+        "scaler": scaler,
+        "feature_names": feature_names,
+        "model_performance": performance,
+        "feature_importance": {name: round(float(value), 4) for name, value in importance},
+        "training_info": {
+            "training_samples": len(y),
+            "churn_rate": round(float(y.mean()), 4),
+            "test_accuracy": performance["accuracy"],
+            "cross_validation_score": best["mean"]["accuracy"],
+            "cross_validation_auc": best["mean"]["auc_score"],
+            "cross_validation_folds": cv_folds,
+            "hyperparameters": best["params"],
+            "search_space": PARAM_GRID,
+            "candidates": [{"params": r["params"], "mean": r["mean"]} for r in results]
         }
     }
-}
 
-# Save model metadata
-with open("static/downloads/churn_model.pkl", "wb") as f:
-    pickle.dump(model_data, f)
+    # Save the fitted model, scaler and metadata as a download
+    with open("static/downloads/churn_model.pkl", "wb") as f:
+        pickle.dump(model_data, f)
+
+    # Publish the array artifact the server maps
+    version = save_model(os.environ.get("CHURN_MODEL_DIR", "data/churn_model"), model_data)
+
+    print(f"Churn prediction model saved successfully (version {version})")
+    print(f"Best of {len(results)} candidates: {best['params']}")
+    print(f"CV accuracy {best['mean']['accuracy']:.4f}, AUC {best['mean']['auc_score']:.4f}; "
+          f"test accuracy {performance['accuracy']:.4f}, AUC {performance['auc_score']:.4f}")
+
 
-print("Churn prediction model metadata saved successfully")
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,141 @@
+"""Electricity consumption dashboard, mounted on the Flask app at /dashboard/
+
+The Dash app shares the Flask server, so it is served by the same
+workers and shows up in /metrics. Callbacks read only the tiles in view
+and downsample them, and the figure is built as a plain dict to skip
+plotly's per-trace validation. The layout is built per page load, so
+the readings are not touched at import time.
+"""
+import time
+
+import numpy as np
+from dash import Dash, Input, Output, ctx, dcc, html, no_update
+
+from electricity import GRANULARITIES, MAX_POINTS
+from metrics import timed
+
+GRANULARITY_LABELS = {'raw': '15 min', 'hourly': 'Hourly', 'daily': 'Daily', 'monthly': 'Monthly'}
+AXIS_LABELS = {'raw': 'kWh per 15 min', 'hourly': 'kWh per hour', 'daily': 'kWh per day',
+               'monthly': 'kWh per month'}
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        return np.datetime64(str(value).replace(' ', 'T'), 'ns')
+    except ValueError:
+        return None
+
+
+def zoom_window(relayout, start, end):
+    """Visible x range from a graph zoom, else the date picker range"""
+    relayout = relayout or {}
+    if relayout.get('xaxis.autorange'):
+        return start, end
+    zoom_start = _parse_time(relayout.get('xaxis.range[0]'))
+    zoom_end = _parse_time(relayout.get('xaxis.range[1]'))
+    if zoom_start is not None and zoom_end is not None:
+        return zoom_start, zoom_end
+    return start, end
+
+
+def build_figure(data, meters, granularity, start=None, end=None, max_points=MAX_POINTS, dates=None):
+    """Plotly figure dict for the selected meters over [start, end)
+
+    dates identifies the date picker range; a new range drops any zoom
+    plotly is keeping on the graph.
+    """
+    traces = []
+    for meter in meters:
+        series = data.plot_series(meter, granularity, start, end, max_points)
+        traces.append({
+            'type': 'scattergl',
+            'mode': 'lines',
+            'name': meter,
+            'x': series.times,
+            'y': series.values,
+        })
+    return {
+        'data': traces,
+        'layout': {
+            'margin': {'l': 60, 'r': 20, 't': 30, 'b': 40},
+            'xaxis': {'type': 'date'},
+            'yaxis': {'title': {'text': AXIS_LABELS[granularity]}},
+            'legend': {'orientation': 'h'},
+            'uirevision': f"{','.join(meters)}|{granularity}|{dates}",
+        },
+    }
+
+
+def _summary_cards(summary):
+    cards = (
+        ('Total consumption', f"{summary['total_kwh']:,.0f} kWh"),
+        ('Average per day', f"{summary['average_daily_kwh']:,.1f} kWh"),
+        ('Peak meter-day', f"{summary['peak_daily_kwh']:,.1f} kWh"),
+    )
+    return [html.Div([html.Div(label, className='label'), html.Div(value, className='value')],
+                     className='summary-card')
+            for label, value in cards]
+
+
+def _layout(data):
+    meters = data.meters
+    first, last = (str(t.astype('datetime64[D]')) for t in data.span())
+    return html.Div([
+        html.H1('Electricity Consumption Dashboard'),
+        html.Div([
+            dcc.Dropdown(id='meters', options=meters, value=meters[:2], multi=True),
+            dcc.RadioItems(id='granularity', value='daily', inline=True,
+                           options=[{'label': GRANULARITY_LABELS[g], 'value': g} for g in GRANULARITIES]),
+            dcc.DatePickerRange(id='dates', min_date_allowed=first, max_date_allowed=last,
+                                start_date=first, end_date=last),
+        ], className='controls'),
+        html.Div(id='summary', className='summary'),
+        dcc.Graph(id='consumption', config={'displaylogo': False}),
+        html.Div(id='timing', className='timing'),
+    ])
+
+
+def init_dashboard(server, data):
+    """Mount the dashboard on the Flask server; returns the Dash app"""
+    dashboard = Dash(__name__, server=server, url_base_pathname='/dashboard/',
+                     title='Electricity Consumption Dashboard')
+    dashboard.layout = lambda: _layout(data)
+
+    @dashboard.callback(
+        Output('consumption', 'figure'),
+        Output('summary', 'children'),
+        Output('timing', 'children'),
+        Output('consumption', 'relayoutData'),
+        Input('meters', 'value'),
+        Input('granularity', 'value'),
+        Input('dates', 'start_date'),
+        Input('dates', 'end_date'),
+        Input('consumption', 'relayoutData'),
+    )
+    def update(selected, granularity, start_date, end_date, relayout):
+        started = time.perf_counter()
+        meters = set(data.meters)
+        selected = [meter for meter in (selected or []) if meter in meters]
+        if granularity not in GRANULARITIES:
+            granularity = 'daily'
+        end = _parse_time(end_date)
+        if end is not None:
+            # The picker's end date is inclusive
+            end += np.timedelta64(1, 'D')
+        # relayoutData keeps reporting the last zoom, so a new date range
+        # clears it rather than being overridden by it
+        reset_zoom = ctx.triggered_id == 'dates'
+        if reset_zoom:
+            relayout = None
+        start, end = zoom_window(relayout, _parse_time(start_date), end)
+        with timed('aggregate'):
+            figure = build_figure(data, selected, granularity, start, end, dates=f'{start_date}|{end_date}')
+            summary = data.summary(selected, start, end)
+        elapsed = (time.perf_counter() - started) * 1000
+        points = sum(len(trace['x']) for trace in figure['data'])
+        return (figure, _summary_cards(summary), f"{points:,} points in {elapsed:.1f} ms",
+                None if reset_zoom else no_update)
+
+    return dashboard
@@ -0,0 +1,158 @@
+import gzip
+import logging
+import mimetypes
+import os
+import stat
+import threading
+import time
+
+from flask import request, send_file
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are produced without it
+    brotli = None
+
+# Text-like artifacts worth storing precompressed; PDFs are already compressed
+COMPRESSIBLE_EXTENSIONS = {'.csv', '.css', '.html', '.js', '.json', '.md', '.py',
+                           '.r', '.sql', '.svg', '.txt', '.xml'}
+
+# Preferred order when a client accepts several encodings equally
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+# How long a cached stat() result is trusted before the file is checked again
+REVALIDATE_SECONDS = 30.0
+
+DOWNLOAD_MAX_AGE = 3600
+
+
+class Artifact:
+    """A downloadable file, its validators and any precompressed variants"""
+
+    def __init__(self, path):
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode):
+            raise FileNotFoundError(f"{path} is not a file")
+        self.path = path
+        self.mtime = st.st_mtime
+        self.size = st.st_size
+        self.etag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.checked_at = time.monotonic()
+
+        # Only use a variant that was generated from this version of the file
+        self.variants = {}
+        for encoding, suffix in ENCODING_SUFFIXES:
+            try:
+                variant = os.stat(path + suffix)
+            except OSError:
+                continue
+            if variant.st_mtime >= st.st_mtime:
+                self.variants[encoding] = path + suffix
+
+    def negotiate(self, accept_encodings):
+        """Pick (encoding, path, etag) for a request's Accept-Encoding"""
+        best = None
+        for encoding, _ in ENCODING_SUFFIXES:
+            if encoding not in self.variants:
+                continue
+            quality = accept_encodings[encoding]
+            if quality and (best is None or quality > best[0]):
+                best = (quality, encoding)
+        if best is None:
+            return None, self.path, self.etag
+        encoding = best[1]
+        return encoding, self.variants[encoding], f"{self.etag}-{encoding}"
+
+
+class ArtifactStore:
+    """Serves files from one directory with Range, validators and precompression
+
+    Paths are resolved against a fixed directory and stat() results are
+    cached for REVALIDATE_SECONDS, so a download costs no path building
+    or repeated metadata lookups.
+    """
+
+    def __init__(self, directory, max_age=DOWNLOAD_MAX_AGE, immutable=False):
+        self.directory = directory
+        self.max_age = max_age
+        # For content-hashed names, which never change once written
+        self.immutable = immutable
+        self._lock = threading.Lock()
+        self._artifacts = {}
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, name):
+        """Cached Artifact for a file name; raises FileNotFoundError if missing"""
+        artifact = self._artifacts.get(name)
+        if artifact is None or time.monotonic() - artifact.checked_at > REVALIDATE_SECONDS:
+            artifact = Artifact(self.path(name))
+            with self._lock:
+                self._artifacts[name] = artifact
+        return artifact
+
+    def clear(self):
+        with self._lock:
+            self._artifacts.clear()
+
+    def send(self, name, as_attachment=False, download_name=None):
+        """Send a file, honouring Range, If-None-Match and If-Modified-Since"""
+        artifact = self.get(name)
+        encoding, path, etag = artifact.negotiate(request.accept_encodings)
+        response = send_file(path, mimetype=artifact.mimetype, as_attachment=as_attachment,
+                             download_name=download_name or name, conditional=True,
+                             etag=etag, last_modified=artifact.mtime, max_age=self.max_age)
+        if self.immutable:
+            response.cache_control.immutable = True
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if artifact.variants:
+            response.vary.add('Accept-Encoding')
+        return response
+
+
+def precompress(directory, skip=()):
+    """Write .gz (and .br when brotli is installed) next to compressible files
+
+    Variants that are already newer than their source are left alone, and a
+    variant that would not be smaller than the original is not kept. Names
+    in `skip` are not compressed. Returns the paths written.
+    """
+    written = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name in skip or not os.path.isfile(path):
+            continue
+        written += precompress_file(path)
+    return written
+
+
+def precompress_file(path):
+    """Variants of one file, as precompress() writes them; returns the paths written"""
+    name = os.path.basename(path)
+    if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return []
+    source_mtime = os.stat(path).st_mtime
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    written = []
+    for encoding, suffix in ENCODING_SUFFIXES:
+        if encoding == 'br' and brotli is None:
+            continue
+        target = path + suffix
+        if os.path.exists(target) and os.stat(target).st_mtime >= source_mtime:
+            continue
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) >= len(data):
+            logging.debug("Skipping %s: %s variant is not smaller", name, encoding)
+            continue
+        with open(target, 'wb') as f:
+            f.write(compressed)
+        written.append(target)
+    return written
@@ -0,0 +1,257 @@
+"""Electricity meter readings, rollups and downsampling for the dashboard
+
+Readings and their hourly and daily rollups live in a TileStore, so a
+callback maps only the tiles in view instead of aggregating the whole
+history. Monthly buckets are folded from the daily tiles in view, and
+every series is cut down to a few thousand points with LTTB before it is
+sent to the browser.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+from tiles import LEVELS
+
+READING_INTERVAL = np.timedelta64(15, 'm')
+
+# Pyramid level each granularity reads; monthly is folded from daily
+GRANULARITY_LEVELS = {'raw': 'raw', 'hourly': 'hourly', 'daily': 'daily', 'monthly': 'daily'}
+GRANULARITIES = tuple(GRANULARITY_LEVELS)
+
+# Points per series sent to the browser
+MAX_POINTS = 2000
+
+# Preselected min/max candidates per LTTB bucket on long series
+LTTB_CANDIDATES = 4
+
+# Raw readings in view above which a raw plot is built from the min and
+# max of hourly or daily rollups instead of the readings themselves
+RAW_LTTB_INPUT = MAX_POINTS * 32
+
+# Rollups a long raw view may read, finest first
+ENVELOPE_LEVELS = ('hourly', 'daily')
+
+# Readings per TileStore.append while seeding synthetic data
+APPEND_CHUNK = 1 << 18
+
+
+class Series:
+    """Timestamped values, sorted by time"""
+
+    __slots__ = ('times', 'values')
+
+    def __init__(self, times, values):
+        self.times = times
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+
+def downsample(buckets, column='sum', max_points=MAX_POINTS):
+    """Series of one bucket column, cut down with LTTB
+
+    Bucket numbers are proportional to time, so they serve as the x axis
+    and timestamps are built only for the points kept.
+    """
+    values = buckets[column]
+    keep = lttb(buckets.index.astype(np.float64), values, max_points)
+    return Series((buckets.index[keep] * buckets.level.width).astype('datetime64[ns]'), values[keep])
+
+
+def envelope(buckets, max_points=MAX_POINTS):
+    """Series of the readings' min and max per rollup bucket, cut down with LTTB
+
+    Each bucket's min and max are real readings, so peaks and troughs
+    survive at the raw scale; they are placed at a quarter and three
+    quarters of the bucket, since the rollups do not keep their times.
+    """
+    x = (buckets.index[:, None] + np.array([0.25, 0.75])).ravel()
+    y = np.stack((buckets['min'], buckets['max']), axis=1).ravel()
+    keep = lttb(x, y, max_points)
+    return Series((x[keep] * buckets.level.width).astype(np.int64).astype('datetime64[ns]'), y[keep])
+
+
+def monthly(buckets):
+    """Fold daily buckets into calendar months"""
+    if not len(buckets):
+        return Series(np.empty(0, dtype='datetime64[ns]'), np.empty(0))
+    months = buckets.index.astype('datetime64[D]').astype('datetime64[M]')
+    starts = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+    return Series(months[starts].astype('datetime64[ns]'), np.add.reduceat(buckets['sum'], starts))
+
+
+def lttb(x, y, threshold, candidates_per_bucket=LTTB_CANDIDATES):
+    """Indexes of the points kept by Largest-Triangle-Three-Buckets
+
+    Long inputs are first reduced to the min and max of small sub-buckets
+    (MinMaxLTTB) in one vectorized pass, so the sequential LTTB step only
+    walks a few candidates per output point.
+    """
+    n = len(y)
+    if threshold < 3 or n <= threshold:
+        return np.arange(n)
+    buckets = threshold - 2
+    interior = n - 2
+    edges = 1 + (np.arange(buckets + 1) * interior) // buckets
+    width = np.diff(edges)
+    # Average of the following bucket, the third corner of each triangle
+    next_x = np.append((np.add.reduceat(x, edges[:-1], dtype=np.float64) / width)[1:], x[-1]).tolist()
+    next_y = np.append((np.add.reduceat(y, edges[:-1], dtype=np.float64) / width)[1:], y[-1]).tolist()
+
+    sub = buckets * max(1, candidates_per_bucket // 2)
+    step = interior // sub
+    if step < 2:
+        candidates = np.arange(1, n - 1)
+    else:
+        block = y[1:1 + sub * step].reshape(sub, step)
+        low = block.argmin(axis=1)
+        high = block.argmax(axis=1)
+        offsets = 1 + np.arange(sub) * step
+        pairs = np.stack((offsets + np.minimum(low, high), offsets + np.maximum(low, high)), axis=1)
+        candidates = np.concatenate((pairs.ravel(), np.arange(1 + sub * step, n - 1)))
+
+    bounds = np.searchsorted(candidates, edges).tolist()
+    cand_x = x[candidates].tolist()
+    cand_y = y[candidates].tolist()
+    cand = candidates.tolist()
+    selected = [0]
+    ax, ay = float(x[0]), float(y[0])
+    for i in range(buckets):
+        nx, ny = next_x[i], next_y[i]
+        best, pick = -1.0, -1
+        for k in range(bounds[i], bounds[i + 1]):
+            area = abs((ax - nx) * (cand_y[k] - ay) - (ax - cand_x[k]) * (ny - ay))
+            if area > best:
+                best, pick = area, k
+        if pick >= 0:
+            selected.append(cand[pick])
+            ax, ay = cand_x[pick], cand_y[pick]
+    selected.append(n - 1)
+    return np.array(selected, dtype=np.int64)
+
+
+def meter_names(meters):
+    return [f'meter-{meter:03d}' for meter in range(1, meters + 1)]
+
+
+def synthetic_readings(rows, meters=8, seed=7, end=None):
+    """(meter, times, kWh) of synthetic 15-minute readings with daily, weekly and seasonal cycles"""
+    end = np.datetime64(end or 'today', 'D').astype('datetime64[ns]')
+    per_meter = max(1, rows // meters)
+    start = end - per_meter * READING_INTERVAL
+    rng = np.random.default_rng(seed)
+
+    minutes = np.arange(per_meter, dtype=np.float64) * (READING_INTERVAL / np.timedelta64(1, 'm'))
+    minutes += (start - start.astype('datetime64[D]')) / np.timedelta64(1, 'm')
+    hour = (minutes % 1440) / 60
+    day = minutes // 1440 + (start.astype('datetime64[D]').astype(np.int64))
+    # 1970-01-01 was a Thursday
+    weekend = ((day + 3) % 7) >= 5
+    day_of_year = (day % 365.25) / 365.25
+    shape = (0.55
+             + 0.25 * np.exp(-((hour - 8) / 2.0) ** 2)
+             + 0.45 * np.exp(-((hour - 19) / 2.5) ** 2))
+    shape *= np.where(weekend, 1.15, 1.0)
+    shape *= 1.0 + 0.3 * np.cos(2 * np.pi * (day_of_year - 0.04))
+    per_reading = READING_INTERVAL / np.timedelta64(1, 'h')
+
+    times = start + np.arange(per_meter) * READING_INTERVAL
+    for name in meter_names(meters):
+        base_kw = rng.uniform(0.4, 3.0)
+        noise = rng.gamma(16.0, 1 / 16.0, size=per_meter)
+        yield name, times, (base_kw * per_reading * shape * noise).astype(np.float32)
+
+
+class ElectricityData:
+    """Meter readings in a tile pyramid, seeded with synthetic data on first use"""
+
+    def __init__(self, store, rows, meters=8, seed=7, end=None):
+        self.store = store
+        self.rows = rows
+        self.meter_count = meters
+        self.seed = seed
+        self.end = np.datetime64(end or 'today', 'D').astype('datetime64[ns]')
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def ensure(self):
+        """Seed the store with synthetic readings for any missing meter"""
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            with self.store.locked():
+                missing = set(meter_names(self.meter_count)) - set(self.store.manifest())
+                if missing:
+                    started = time.perf_counter()
+                    for name, times, kwh in synthetic_readings(self.rows, self.meter_count, self.seed, self.end):
+                        if name not in missing:
+                            continue
+                        for lo in range(0, len(kwh), APPEND_CHUNK):
+                            self.store.append(name, times[lo:lo + APPEND_CHUNK], kwh[lo:lo + APPEND_CHUNK])
+                    logging.info("Seeded %d meters with synthetic readings in %.2fs",
+                                 len(missing), time.perf_counter() - started)
+            self._ready = True
+
+    @property
+    def meters(self):
+        self.ensure()
+        return self.store.meters()
+
+    def span(self):
+        """(first reading, end of last reading) over all meters"""
+        self.ensure()
+        spans = [self.store.span(meter) for meter in self.store.meters()]
+        return min(s[0] for s in spans), max(s[1] for s in spans)
+
+    def append(self, meter, times, kwh):
+        """Add new readings; only the tiles they fall into are rewritten"""
+        return self.store.append(meter, times, kwh)
+
+    def plot_series(self, meter, granularity, start=None, end=None, max_points=MAX_POINTS):
+        """Downsampled (times, kWh) for one meter over [start, end)"""
+        self.ensure()
+        if granularity == 'raw':
+            level = self._envelope_level(meter, start, end)
+            if level is not None:
+                return envelope(self.store.query(meter, level, start, end, columns=('min', 'max')), max_points)
+        buckets = self.store.query(meter, GRANULARITY_LEVELS[granularity], start, end)
+        if granularity == 'monthly':
+            return monthly(buckets)
+        return downsample(buckets, 'sum', max_points)
+
+    def _envelope_level(self, meter, start, end):
+        """Rollup a raw view of [start, end) should be drawn from, or None for the readings"""
+        span = self.store.span(meter)
+        if span is None:
+            return None
+        first = span[0] if start is None else max(np.datetime64(start, 'ns'), span[0])
+        last = span[1] if end is None else min(np.datetime64(end, 'ns'), span[1])
+        duration = (last - first) // np.timedelta64(1, 'ns')
+        if duration <= RAW_LTTB_INPUT * LEVELS['raw'].width:
+            return None
+        for level in ENVELOPE_LEVELS:
+            # Two candidate points per bucket
+            if 2 * duration <= RAW_LTTB_INPUT * LEVELS[level].width:
+                return level
+        return ENVELOPE_LEVELS[-1]
+
+    def summary(self, meters, start=None, end=None):
+        """Total, daily average and peak daily use over [start, end)"""
+        self.ensure()
+        total = 0.0
+        days = 0
+        peak = 0.0
+        for meter in meters:
+            daily = self.store.query(meter, 'daily', start, end)
+            if not len(daily):
+                continue
+            total += float(daily['sum'].sum())
+            days = max(days, len(daily))
+            peak = max(peak, float(daily['sum'].max()))
+        return {'total_kwh': total, 'average_daily_kwh': total / days if days else 0.0,
+                'peak_daily_kwh': peak}
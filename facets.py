@@ -0,0 +1,72 @@
+def bits_from_positions(positions, size):
+    """Build an int bitset with the given positions set"""
+    buf = bytearray((size + 7) // 8)
+    for pos in positions:
+        buf[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def positions_from_bits(bits):
+    """Return the set positions of an int bitset in ascending order"""
+    if not bits:
+        return []
+    text = format(bits, 'b')[::-1]
+    positions = []
+    pos = text.find('1')
+    while pos != -1:
+        positions.append(pos)
+        pos = text.find('1', pos + 1)
+    return positions
+
+
+class FacetIndex:
+    """Technology and category bitsets over one list of projects
+
+    Bit i of every set stands for projects[i], so combining filters is an
+    AND of Python ints and counting a facet is a popcount.
+    """
+
+    def __init__(self, projects, summaries=None):
+        self.projects = projects
+        self.size = len(projects)
+        self.all_bits = (1 << self.size) - 1
+
+        tech_positions = {}
+        category_positions = {}
+        # Summaries carry just the technologies and category of each project
+        for pos, project in enumerate(projects if summaries is None else summaries):
+            for tech in set(project.get('technologies', [])):
+                tech_positions.setdefault(tech, []).append(pos)
+            category = project.get('category', 'Other')
+            category_positions.setdefault(category, []).append(pos)
+
+        self.tech_bits = {tech: bits_from_positions(positions, self.size)
+                          for tech, positions in tech_positions.items()}
+        self.category_bits = {category: bits_from_positions(positions, self.size)
+                              for category, positions in category_positions.items()}
+        self.technologies = sorted(self.tech_bits)
+        self.categories = sorted(self.category_bits)
+
+    def select(self, tech='', category=''):
+        """Bitset of projects matching every given filter"""
+        bits = self.all_bits
+        if tech:
+            bits &= self.tech_bits.get(tech, 0)
+        if category:
+            bits &= self.category_bits.get(category, 0)
+        return bits
+
+    def projects_for(self, bits):
+        """Projects in the bitset, in catalog order"""
+        projects = self.projects
+        return [projects[pos] for pos in positions_from_bits(bits)]
+
+    def tech_counts(self, bits):
+        """Number of selected projects using each technology"""
+        return {tech: (tech_bits & bits).bit_count()
+                for tech, tech_bits in self.tech_bits.items()}
+
+    def category_counts(self, bits):
+        """Number of selected projects in each category"""
+        return {category: (category_bits & bits).bit_count()
+                for category, category_bits in self.category_bits.items()}
@@ -0,0 +1,98 @@
+import codecs
+import functools
+import mmap
+import os
+from array import array
+
+# Lines per page when only one of start/count is given, and the upper bound
+DEFAULT_PAGE_LINES = 500
+MAX_PAGE_LINES = 5000
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class LineIndex:
+    """Byte offset of every line start in a file, built by scanning an mmap"""
+
+    def __init__(self, path):
+        offsets = array('Q', [0])
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    find = mm.find
+                    pos = find(b'\n')
+                    while pos != -1:
+                        offsets.append(pos + 1)
+                        pos = find(b'\n', pos + 1)
+        if offsets[-1] != size:
+            # Last line has no trailing newline
+            offsets.append(size)
+        self.offsets = offsets
+        self.line_count = len(offsets) - 1
+
+
+@functools.lru_cache(maxsize=64)
+def _line_index(path, mtime_ns, size):
+    return LineIndex(path)
+
+
+def line_index(path):
+    """Cached LineIndex for a file, rebuilt when its mtime or size changes"""
+    st = os.stat(path)
+    return _line_index(path, st.st_mtime_ns, st.st_size)
+
+
+class PreviewPage:
+    """A slice of lines from a file plus the data needed for pager links"""
+
+    def __init__(self, text, start, count, line_count):
+        self.text = text
+        self.start = start
+        self.count = count
+        self.line_count = line_count
+        self.first_line = min(start + 1, line_count)
+        self.last_line = min(start + count, line_count)
+        self.prev_start = max(start - count, 0) if start > 0 else None
+        self.next_start = start + count if start + count < line_count else None
+
+
+def read_page(path, start, count):
+    """Read lines [start, start + count) without touching the rest of the file"""
+    index = line_index(path)
+    count = max(1, min(count, MAX_PAGE_LINES))
+    start = max(0, min(start, index.line_count))
+    end = min(start + count, index.line_count)
+    begin_byte = index.offsets[start]
+    end_byte = index.offsets[end]
+
+    text = ''
+    if end_byte > begin_byte:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = mm[begin_byte:end_byte].decode('utf-8', errors='replace')
+    return PreviewPage(text, start, count, index.line_count)
+
+
+def iter_text(path, chunk_size=STREAM_CHUNK_BYTES):
+    """Iterator over a file's decoded text in fixed-size chunks
+
+    The file is opened before this returns, so a missing or unreadable
+    file raises here instead of partway through a streamed response.
+    """
+    return _decoded_chunks(open(path, 'rb'), chunk_size)
+
+
+def _decoded_chunks(f, chunk_size):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
@@ -0,0 +1,239 @@
+"""Static export of the catalog pages with incremental rebuilds
+
+Every page that is a pure function of projects.json is rendered through
+the app and written as a file a plain web server or CDN can serve:
+
+    <out>/index.html                  /
+    <out>/index/<query>.html          /?tech=...&category=... (urlencoded, tech first)
+    <out>/about/index.html            /about
+    <out>/project/<id>/index.html     /project/<id>
+    <out>/assets/, <out>/static/      asset bundles and static files
+    <out>/manifest.json               per page: file, input key and content hash
+
+A page's input key hashes exactly the catalog data it reads, plus the
+templates and asset bundle names. A rebuild only renders pages whose key
+changed, so editing one project re-renders its detail page and the
+listings that contain it. Pages are rendered in batches over a process
+pool, each worker issuing GETs through its own test client.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlencode
+
+from bundles import MANIFEST
+from downloads import ENCODING_SUFFIXES, precompress_file
+from facets import positions_from_bits
+
+FORMAT = 'portfolio-static/1'
+
+# Pages rendered per worker task
+BATCH_PAGES = 64
+
+# Directories under static/ that are not part of the export: downloads are
+# served by the app, dist is copied to assets/
+SKIPPED_STATIC = ('downloads', 'dist')
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode('utf-8') if isinstance(part, str) else part)
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def render_salt(app, asset_manifest):
+    """Hash of everything besides the catalog that shapes a page"""
+    env = app.jinja_env
+    sources = [f'{name}\0{env.loader.get_source(env, name)[0]}'
+               for name in sorted(env.list_templates(filter_func=lambda name: name.endswith('.html')))]
+    return _digest(FORMAT, json.dumps(asset_manifest, sort_keys=True), *sources)
+
+
+def page_file(path):
+    """File under the export directory that holds a page path"""
+    route, _, query = path.partition('?')
+    if query:
+        return os.path.join('index', f'{query}.html')
+    route = route.strip('/')
+    return os.path.join(route, 'index.html') if route else 'index.html'
+
+
+def pages(snapshot, salt):
+    """[(path, input key)] of every catalog page in the snapshot"""
+    facets = snapshot.facets
+    projects = snapshot.projects
+    digests = [_digest(json.dumps(project, sort_keys=True)) for project in projects]
+    vocabulary = _digest(salt, json.dumps([facets.technologies, facets.categories]))
+
+    def listing(tech='', category=''):
+        params = {name: value for name, value in (('tech', tech), ('category', category)) if value}
+        selected = facets.select(tech, category)
+        path = '/?' + urlencode(params) if params else '/'
+        key = _digest(vocabulary, path, *(digests[pos] for pos in positions_from_bits(selected)))
+        return path, key
+
+    result = [listing()]
+    result += [listing(tech=tech) for tech in facets.technologies]
+    result += [listing(category=category) for category in facets.categories]
+    result += [listing(tech, category) for tech in facets.technologies for category in facets.categories]
+    result.append(('/about', _digest(salt, '/about', json.dumps(snapshot.skills.skills, sort_keys=True),
+                                     str(len(projects)))))
+    for project, digest in zip(projects, digests):
+        project_id = str(project.get('id', ''))
+        if not project_id or project_id in ('.', '..') or '/' in project_id or os.sep in project_id:
+            logging.warning("Not exporting project with id %r: not usable as a file name", project_id)
+            continue
+        result.append((f'/project/{project_id}', _digest(salt, digest)))
+    return result
+
+
+_client = None
+
+
+def render_batch(out_dir, version, jobs):
+    """Worker task: GET each (path, previous hash) and write changed bodies
+
+    Returns [(path, content hash, bytes, written)]. Raises RuntimeError when
+    a page fails or projects.json changes under the export.
+    """
+    global _client
+    from app import app, catalog
+
+    if _client is None:
+        _client = app.test_client()
+    results = []
+    for path, previous in jobs:
+        if catalog.snapshot().version != version:
+            raise RuntimeError("projects.json changed during the export; run it again")
+        response = _client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        body = response.get_data()
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        target = os.path.join(out_dir, page_file(path))
+        # An unchanged body keeps its file and mtime, so syncing to a CDN skips it
+        written = digest != previous or not os.path.exists(target)
+        if written:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target + '.tmp', 'wb') as f:
+                f.write(body)
+            os.replace(target + '.tmp', target)
+        results.append((path, digest, len(body), written))
+    return results
+
+
+def _sync_tree(source, target, skip=()):
+    """Copy files whose size or mtime differ; returns the number copied"""
+    copied = 0
+    if not os.path.isdir(source):
+        return copied
+    for directory, dirs, files in os.walk(source):
+        if directory == source:
+            dirs[:] = [d for d in dirs if d not in skip]
+        destination = os.path.join(target, os.path.relpath(directory, source))
+        os.makedirs(destination, exist_ok=True)
+        for name in files:
+            if directory == source and name in skip:
+                continue
+            src, dst = os.path.join(directory, name), os.path.join(destination, name)
+            st = os.stat(src)
+            try:
+                existing = os.stat(dst)
+            except FileNotFoundError:
+                existing = None
+            if existing is None or (existing.st_size, int(existing.st_mtime)) != (st.st_size, int(st.st_mtime)):
+                shutil.copy2(src, dst)
+                copied += 1
+    return copied
+
+
+def _remove(out_dir, file):
+    path = os.path.join(out_dir, file)
+    for suffix in ('',) + tuple(suffix for _, suffix in ENCODING_SUFFIXES):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+    directory = os.path.dirname(path)
+    while directory != out_dir.rstrip(os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifest.get('pages', {}) if manifest.get('format') == FORMAT else {}
+
+
+def freeze(app, catalog, asset_manifest, static_dir, out_dir, workers=None, force=False):
+    """Export the catalog pages to out_dir, rendering only those whose inputs changed
+
+    Returns a summary: pages, rendered, written, removed, seconds.
+    """
+    started = time.perf_counter()
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    snapshot = catalog.snapshot()
+    bundles = asset_manifest.manifest()
+    planned = pages(snapshot, render_salt(app, bundles))
+    previous = {} if force else _load_manifest(out_dir)
+
+    manifest = {}
+    pending = []
+    for path, key in planned:
+        entry = previous.get(path)
+        if entry is not None and entry['key'] == key and os.path.exists(os.path.join(out_dir, entry['file'])):
+            manifest[path] = entry
+        else:
+            pending.append((path, key, entry['hash'] if entry else None))
+    logging.info("Exporting %d pages: %d unchanged, %d to render", len(planned), len(manifest), len(pending))
+
+    written = 0
+    if pending:
+        keys = {path: key for path, key, _ in pending}
+        batches = [[(path, digest) for path, _, digest in pending[i:i + BATCH_PAGES]]
+                   for i in range(0, len(pending), BATCH_PAGES)]
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_batch, out_dir, snapshot.version, batch) for batch in batches]
+            for future in futures:
+                for path, digest, size, changed in future.result():
+                    manifest[path] = {'file': page_file(path), 'key': keys[path], 'hash': digest, 'bytes': size}
+                    written += changed
+        # Only page files get variants; manifest.json is rewritten below
+        for path in keys:
+            precompress_file(os.path.join(out_dir, page_file(path)))
+
+    removed = [path for path in previous if path not in manifest]
+    for path in removed:
+        _remove(out_dir, previous[path]['file'])
+
+    _sync_tree(static_dir, os.path.join(out_dir, 'static'), skip=SKIPPED_STATIC)
+    _sync_tree(asset_manifest.dist_dir, os.path.join(out_dir, 'assets'),
+               skip=(MANIFEST,) + tuple(MANIFEST + suffix for _, suffix in ENCODING_SUFFIXES))
+
+    # Written last, so the manifest only names pages that are on disk; a
+    # variant left by an earlier export would be served in its place
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    for _, suffix in ENCODING_SUFFIXES:
+        if os.path.exists(manifest_path + suffix):
+            os.remove(manifest_path + suffix)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump({'format': FORMAT, 'catalog_version': snapshot.version,
+                   'pages': dict(sorted(manifest.items()))}, f, indent=1)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return {'pages': len(manifest), 'rendered': len(pending), 'written': written,
+            'removed': len(removed), 'seconds': round(time.perf_counter() - started, 3)}
@@ -0,0 +1,61 @@
+"""Production gunicorn settings
+
+    gunicorn main:app
+
+The app is imported once in the master (preload_app). The master builds
+the catalog, its search/facet/skill indexes and every compiled template,
+then gc.freeze()s them before forking. Workers share those pages
+copy-on-write, and the collector never walks them, so it never writes
+to them. Each worker renders the main pages once before it starts
+accepting connections.
+
+`kill -HUP <master pid>` rebuilds the catalog in the master and replaces
+the workers gracefully: new workers fork from the fresh state while the
+old ones finish their in-flight requests on the same listening sockets.
+Edits to projects.json between reloads are published to the shared
+catalog store once and picked up by every worker at the same generation.
+"""
+import gc
+import multiprocessing
+import os
+
+from shared_catalog import default_directory
+
+bind = os.environ.get("BIND", "0.0.0.0:7323")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+graceful_timeout = 30
+
+# Workers follow one published catalog generation instead of parsing
+# projects.json each (see shared_catalog.py)
+os.environ.setdefault("CATALOG_SHARED_DIR", default_directory('data/projects.json'))
+
+def _freeze():
+    # Move everything built so far to the permanent generation: the
+    # collector stays on in master and workers but never walks (and so
+    # never writes to) the pages the workers share
+    gc.collect()
+    gc.freeze()
+
+
+def when_ready(server):
+    from app import warm_caches
+    warm_caches()
+    _freeze()
+    server.log.info("Catalog and templates warmed in master; %d objects frozen", gc.get_freeze_count())
+
+
+def on_reload(server):
+    from app import catalog, page_cache, warm_caches
+    gc.unfreeze()
+    catalog.invalidate()
+    page_cache.clear()
+    warm_caches()
+    _freeze()
+    server.log.info("Catalog reloaded on SIGHUP (version %s)", catalog.snapshot().version)
+
+
+def post_worker_init(worker):
+    from app import warm_up_requests
+    warm_up_requests()
+    worker.log.info("Worker %s warmed up", worker.pid)
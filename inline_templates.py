@@ -0,0 +1,293 @@
+"""Page templates that ship with the app instead of living in templates/
+
+They are registered with the Jinja loader under the names in
+INLINE_TEMPLATES and compiled once at startup. A file with the same name
+in templates/ takes precedence.
+"""
+
+FINANCIAL_SERVICES_DEMO_HTML = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Financial Services AI System - Live Demo</title>
+    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
+    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
+    <link href="{{ asset_url('demo.css') }}" rel="stylesheet">
+</head>
+<body class="demo-container">
+    <div class="container">
+        <!-- Header -->
+        <div class="row mb-5">
+            <div class="col-12 text-center">
+                <h1 class="display-4 text-light mb-3">
+                    <i class="fas fa-chart-line me-3"></i>Financial Services AI System
+                </h1>
+                <p class="lead text-light opacity-75">Live Interactive Demonstration</p>
+            </div>
+        </div>
+
+        <!-- AI Financial Advisor Demo -->
+        <div class="row mb-4">
+            <div class="col-12">
+                <div class="feature-card">
+                    <h3 class="text-primary mb-3">
+                        <i class="fas fa-robot me-2"></i>AI Financial Advisor
+                    </h3>
+                    <p class="text-light mb-4">Experience our AI-powered financial advisory system with real-time personalized recommendations.</p>
+                    
+                    <div class="row">
+                        <div class="col-md-6">
+                            <h5 class="text-light mb-3">Try These Questions:</h5>
+                            <button class="demo-button" onclick="askAI('How should I start investing with $10,000?')">
+                                Investment Strategy
+                            </button>
+                            <button class="demo-button" onclick="askAI('What are the best retirement planning options for someone in their 30s?')">
+                                Retirement Planning
+                            </button>
+                            <button class="demo-button" onclick="askAI('How can I reduce my financial risk in this market?')">
+                                Risk Management
+                            </button>
+                            <button class="demo-button" onclick="askAI('What should I know about cryptocurrency investments?')">
+                                Crypto Advice
+                            </button>
+                        </div>
+                        <div class="col-md-6">
+                            <div class="form-group mb-3">
+                                <label class="text-light mb-2">Or ask your own question:</label>
+                                <textarea id="customQuestion" class="form-control bg-dark text-light border-secondary" 
+                                         rows="3" placeholder="Enter your financial question here..."></textarea>
+                            </div>
+                            <button class="demo-button" onclick="askCustomQuestion()">
+                                <i class="fas fa-paper-plane me-2"></i>Ask AI
+                            </button>
+                        </div>
+                    </div>
+                    
+                    <div id="aiLoading" class="loading">
+                        <div class="spinner"></div>
+                        <p class="text-light">AI is analyzing your question...</p>
+                    </div>
+                    
+                    <div id="aiResponse" class="ai-response" style="display: none;">
+                        <h6 class="text-primary">AI Financial Advisor Response:</h6>
+                        <div id="aiResponseText"></div>
+                    </div>
+                </div>
+            </div>
+        </div>
+
+        <!-- Market Data Dashboard Demo -->
+        <div class="row mb-4">
+            <div class="col-12">
+                <div class="feature-card">
+                    <h3 class="text-success mb-3">
+                        <i class="fas fa-chart-bar me-2"></i>Real-Time Market Data
+                    </h3>
+                    <p class="text-light mb-4">Live market data integration with comprehensive financial analytics.</p>
+                    
+                    <div class="row">
+                        <div class="col-md-6">
+                            <button class="demo-button" onclick="loadMarketData('AAPL')">Apple (AAPL)</button>
+                            <button class="demo-button" onclick="loadMarketData('GOOGL')">Google (GOOGL)</button>
+                            <button class="demo-button" onclick="loadMarketData('MSFT')">Microsoft (MSFT)</button>
+                            <button class="demo-button" onclick="loadMarketData('TSLA')">Tesla (TSLA)</button>
+                        </div>
+                        <div class="col-md-6">
+                            <div class="form-group mb-3">
+                                <label class="text-light mb-2">Enter Stock Symbol:</label>
+                                <input type="text" id="stockSymbol" class="form-control bg-dark text-light border-secondary" 
+                                       placeholder="e.g., NVDA, META, AMZN" maxlength="5">
+                            </div>
+                            <button class="demo-button" onclick="loadCustomStock()">
+                                <i class="fas fa-search me-2"></i>Get Data
+                            </button>
+                        </div>
+                    </div>
+                    
+                    <div id="marketLoading" class="loading">
+                        <div class="spinner"></div>
+                        <p class="text-light">Fetching real-time market data...</p>
+                    </div>
+                    
+                    <div id="marketData" style="display: none;"></div>
+                </div>
+            </div>
+        </div>
+
+        <!-- Customer Support Demo -->
+        <div class="row mb-4">
+            <div class="col-12">
+                <div class="feature-card">
+                    <h3 class="text-warning mb-3">
+                        <i class="fas fa-headset me-2"></i>24/7 AI Customer Support
+                    </h3>
+                    <p class="text-light mb-4">Intelligent customer support system with instant responses.</p>
+                    
+                    <div class="row">
+                        <div class="col-md-6">
+                            <h5 class="text-light mb-3">Common Support Topics:</h5>
+                            <button class="demo-button" onclick="getSupport('How do I reset my account password?')">
+                                Account Issues
+                            </button>
+                            <button class="demo-button" onclick="getSupport('I need help understanding my investment portfolio performance.')">
+                                Portfolio Help
+                            </button>
+                            <button class="demo-button" onclick="getSupport('What are your fees and pricing structure?')">
+                                Fees & Pricing
+                            </button>
+                            <button class="demo-button" onclick="getSupport('How do I contact a human advisor?')">
+                                Human Support
+                            </button>
+                        </div>
+                        <div class="col-md-6">
+                            <div class="form-group mb-3">
+                                <label class="text-light mb-2">Describe your issue:</label>
+                                <textarea id="supportQuestion" class="form-control bg-dark text-light border-secondary" 
+                                         rows="3" placeholder="Describe your issue or question..."></textarea>
+                            </div>
+                            <button class="demo-button" onclick="getCustomSupport()">
+                                <i class="fas fa-comments me-2"></i>Get Help
+                            </button>
+                        </div>
+                    </div>
+                    
+                    <div id="supportLoading" class="loading">
+                        <div class="spinner"></div>
+                        <p class="text-light">Support agent is responding...</p>
+                    </div>
+                    
+                    <div id="supportResponse" class="ai-response" style="display: none;">
+                        <h6 class="text-warning">Customer Support Response:</h6>
+                        <div id="supportResponseText"></div>
+                    </div>
+                </div>
+            </div>
+        </div>
+
+
+    </div>
+
+    <script src="{{ asset_url('demo.js') }}"></script>
+</body>
+</html>
+'''
+
+CODE_PREVIEW_HTML = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ filename }} - Code Preview</title>
+    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/themes/prism-dark.min.css">
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-core.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/plugins/autoloader/prism-autoloader.min.js"></script>
+    <link href="{{ asset_url('code_preview.css') }}" rel="stylesheet">
+</head>
+<body class="bg-dark text-light">
+    <div class="container-fluid py-4">
+        <div class="row">
+            <div class="col-12">
+                <div class="card bg-dark border-secondary">
+                    <div class="file-header">
+                        <div class="d-flex justify-content-between align-items-center">
+                            <div>
+                                <h4 class="mb-1">{{ filename }}</h4>
+                                <small class="text-muted">Code Preview - Read Only</small>
+                            </div>
+                            {% if not is_sql_file %}
+                            <div>
+                                <button onclick="goBack()" class="btn btn-outline-light btn-sm me-2">
+                                    <i class="fas fa-arrow-left"></i> Back
+                                </button>
+                                <button onclick="copyCode()" class="btn btn-outline-primary btn-sm" id="copyBtn">
+                                    <i class="fas fa-copy"></i> Copy
+                                </button>
+                            </div>
+                            {% endif %}
+                        </div>
+                    </div>
+                    <div class="card-body p-0 position-relative">
+                        <div class="code-container">
+                            <pre class="language-{{ language }} mb-0"><code>{% for chunk in content_chunks %}{{ chunk }}{% endfor %}</code></pre>
+                        </div>
+                    </div>
+                    {% if page %}
+                    <div class="d-flex justify-content-between align-items-center px-3 py-2 border-top border-secondary">
+                        <small class="text-muted">Lines {{ page.first_line }}-{{ page.last_line }} of {{ page.line_count }}</small>
+                        <div>
+                            {% if page.prev_start is not none %}
+                            <a href="?start={{ page.prev_start }}&amp;count={{ page.count }}" class="btn btn-outline-light btn-sm me-2">Previous</a>
+                            {% endif %}
+                            {% if page.next_start is not none %}
+                            <a href="?start={{ page.next_start }}&amp;count={{ page.count }}" class="btn btn-outline-light btn-sm">Next</a>
+                            {% endif %}
+                        </div>
+                    </div>
+                    {% endif %}
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <script src="{{ asset_url('code_preview.js') }}"></script>
+</body>
+</html>
+'''
+
+FILE_NOT_FOUND_HTML = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>File Not Found</title>
+    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
+</head>
+<body class="bg-dark text-light">
+    <div class="container py-5">
+        <div class="row justify-content-center">
+            <div class="col-md-6 text-center">
+                <h1 class="display-4 mb-4">404</h1>
+                <h3 class="mb-3">File Not Found</h3>
+                <p class="text-muted mb-4">The requested file could not be found.</p>
+                <button onclick="history.back()" class="btn btn-primary">
+                    <i class="fas fa-arrow-left me-2"></i>Go Back
+                </button>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+'''
+
+FILE_ERROR_HTML = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Error</title>
+    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
+</head>
+<body class="bg-dark text-light">
+    <div class="container py-5">
+        <div class="row justify-content-center">
+            <div class="col-md-6 text-center">
+                <h1 class="display-4 mb-4">Error</h1>
+                <p class="text-muted mb-4">{{ error }}</p>
+                <button onclick="history.back()" class="btn btn-primary">
+                    <i class="fas fa-arrow-left me-2"></i>Go Back
+                </button>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+'''
+
+INLINE_TEMPLATES = {
+    'financial_services_demo.html': FINANCIAL_SERVICES_DEMO_HTML,
+    'code_preview.html': CODE_PREVIEW_HTML,
+    'file_not_found.html': FILE_NOT_FOUND_HTML,
+    'file_error.html': FILE_ERROR_HTML,
+}
@@ -0,0 +1,202 @@
+"""Answer retrieval for the financial services demo
+
+Every knowledge-base entry becomes one row of a sparse TF-IDF matrix
+over hashed word unigrams and bigrams. The matrix is kept transposed
+(features x entries), so answering a question is one sparse
+vector-matrix product over the postings of the question's terms plus
+an argpartition over the entries it touched. Cost grows with how many
+entries share the question's terms, not with the size of the base.
+
+    {"entries": [{"id": ..., "topic": "advisor" | "support",
+                  "question": ..., "answer": <html>}, ...]}
+"""
+import functools
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+import scipy.sparse as sp
+
+from search_index import tokenize
+
+# Hashed feature space; collisions are rare at this width for a few 100k terms
+N_FEATURES = 1 << 20
+
+# Share of an entry's score that comes from its question rather than its answer
+QUESTION_WEIGHT = 0.7
+
+# Score below which a question counts as unanswered
+MIN_SCORE = 0.1
+
+# Distinct normalized questions remembered per process
+CACHE_SIZE = 4096
+
+STOP_WORDS = frozenset("""a about am an and are as at be by can could do does for from how i
+if in is it its me my of on or should so that the their there this to was we what when where
+which who why will with would you your""".split())
+
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Replies when nothing in the base is close enough
+FALLBACK_ANSWERS = {
+    'advisor': ("<strong>No close match in our advice library.</strong><br><br>"
+                "Try rephrasing, or ask about investing, retirement, risk, taxes or crypto. "
+                "A live system would route this to an advisor model for personalised advice."),
+    'support': ("<strong>No close match in our help centre.</strong><br><br>"
+                "Try rephrasing, or ask about your account, portfolio, fees or contacting an advisor. "
+                "A live system would open a ticket for a support agent."),
+}
+
+
+# Suffixes stripped so "investments", "investing" and "invest" share a term
+SUFFIXES = ('ments', 'ment', 'ings', 'ing', 'ies', 'es', 's', 'ed')
+
+
+def stem(word):
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+    return word
+
+
+def terms(text):
+    """Unigrams and bigrams of the stemmed non-stop-word tokens"""
+    words = [stem(word) for word in tokenize(text) if word not in STOP_WORDS]
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+
+def feature(term):
+    return zlib.crc32(term.encode('utf-8')) % N_FEATURES
+
+
+def normalize_question(text):
+    return ' '.join(tokenize(text))
+
+
+class AnswerIndex:
+    """Sparse TF-IDF index over one topic's entries"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        questions = self._counts(entry['question'] for entry in entries)
+        answers = self._counts(TAG_RE.sub(' ', entry['answer']) for entry in entries)
+        df = np.bincount((questions + answers).indices, minlength=N_FEATURES)
+        # Smoothed idf and sublinear tf, as TfidfTransformer(sublinear_tf=True) computes them
+        self.idf = np.log((1 + len(entries)) / (1 + df)) + 1
+        # A score is a weighted sum of the cosines with the question and the answer
+        weights = QUESTION_WEIGHT * self._tfidf(questions) + (1 - QUESTION_WEIGHT) * self._tfidf(answers)
+        # Transposed so a query only reads the postings of its own terms
+        self.postings = weights.T.tocsr()
+
+    @staticmethod
+    def _counts(texts):
+        rows, cols = [], []
+        documents = 0
+        for text in texts:
+            features = [feature(term) for term in terms(text)]
+            cols.extend(features)
+            rows.extend([documents] * len(features))
+            documents += 1
+        # Repeated (row, feature) pairs are summed into term counts
+        return sp.csr_matrix((np.ones(len(cols)), (np.asarray(rows, dtype=np.int64),
+                                                   np.asarray(cols, dtype=np.int64))),
+                             shape=(documents, N_FEATURES))
+
+    def _tfidf(self, counts):
+        weights = counts.copy()
+        weights.data = (1 + np.log(weights.data)) * self.idf[weights.indices]
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        return sp.diags(1 / np.where(norms > 0, norms, 1)) @ weights
+
+    def __len__(self):
+        return len(self.entries)
+
+    def query_vector(self, question):
+        """1 x features TF-IDF row of a question, L2-normalized; None if no known terms"""
+        counts = {}
+        for term in terms(question):
+            f = feature(term)
+            counts[f] = counts.get(f, 0) + 1
+        if not counts:
+            return None
+        features = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = (1 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))) * self.idf[features]
+        norm = math.sqrt(float(weights @ weights))
+        return sp.csr_matrix((weights / norm, features, [0, len(features)]), shape=(1, N_FEATURES))
+
+    def search(self, question, k=3):
+        """[(entry index, cosine score)] of the k best matches, best first"""
+        vector = self.query_vector(question)
+        if vector is None:
+            return []
+        scores = vector @ self.postings
+        if not scores.nnz:
+            return []
+        k = min(k, scores.nnz)
+        best = np.argpartition(-scores.data, k - 1)[:k]
+        best = best[np.argsort(-scores.data[best], kind='stable')]
+        return list(zip(scores.indices[best].tolist(), scores.data[best].tolist()))
+
+
+class KnowledgeBase:
+    """Q&A entries from a JSON file, indexed per topic and re-read when the file changes"""
+
+    def __init__(self, path, cache_size=CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._indexes = {}
+        self._answer = None
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def ensure(self):
+        """Index the file if it is new or changed since the last call"""
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            with open(self.path) as f:
+                entries = json.load(f)['entries']
+            by_topic = {}
+            for entry in entries:
+                by_topic.setdefault(entry.get('topic', 'advisor'), []).append(entry)
+            self._indexes = {topic: AnswerIndex(items) for topic, items in by_topic.items()}
+            # Each cache is bound to the indexes it was filled from
+            self._answer = functools.lru_cache(maxsize=self.cache_size)(
+                functools.partial(self._lookup, self._indexes))
+            self._stamp = stamp
+            logging.info("Indexed %d knowledge base entries", len(entries))
+
+    @property
+    def topics(self):
+        self.ensure()
+        return sorted(self._indexes)
+
+    def answer(self, question, topic='advisor', k=3):
+        """{'answer', 'matched', 'score', 'related'} for a free-text question"""
+        self.ensure()
+        return self._answer(normalize_question(question), topic, k)
+
+    @staticmethod
+    def _lookup(indexes, question, topic, k):
+        index = indexes.get(topic)
+        matches = index.search(question, k) if index is not None else []
+        related = [{'id': index.entries[i].get('id'), 'question': index.entries[i]['question'],
+                    'score': round(score, 4)} for i, score in matches]
+        if matches and matches[0][1] >= MIN_SCORE:
+            best = index.entries[matches[0][0]]
+            return {'answer': best['answer'], 'matched': best['question'], 'score': related[0]['score'],
+                    'related': related[1:]}
+        return {'answer': FALLBACK_ANSWERS.get(topic, FALLBACK_ANSWERS['advisor']), 'matched': None,
+                'score': related[0]['score'] if related else 0.0, 'related': related}
@@ -0,0 +1,182 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Request latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def copy(self):
+        clone = Histogram(self.buckets)
+        clone.counts = list(self.counts)
+        clone.total = self.total
+        clone.count = self.count
+        return clone
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, **labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket{_labels(**labels, le=repr(bound))} {cumulative}"
+        yield f"{name}_bucket{_labels(**labels, le='+Inf')} {self.count}"
+        yield f"{name}_sum{_labels(**labels)} {self.total}"
+        yield f"{name}_count{_labels(**labels)} {self.count}"
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to this request's Server-Timing phase"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = g.setdefault('server_timing', {})
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started
+
+
+class RequestMetrics:
+    """Per-endpoint request metrics exported in Prometheus text format
+
+    Records latency histograms, status codes, response bytes and in-flight
+    counts for every request, and adds a Server-Timing header built from
+    the phases recorded with timed().
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._statuses = {}
+        self._bytes = {}
+        self._in_flight = {}
+        self._gauges = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def add_gauge(self, name, help_text, func, kind='gauge'):
+        """Export the value of func() at scrape time"""
+        self._gauges.append((name, help_text, func, kind))
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            self._in_flight[g.metrics_endpoint] = self._in_flight.get(g.metrics_endpoint, 0) + 1
+
+    def _after_request(self, response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = g.metrics_endpoint
+
+        timings = g.get('server_timing', {})
+        entries = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.items()]
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        response.headers['Server-Timing'] = ', '.join(entries)
+
+        size = response.content_length
+        if size is None and response.is_streamed:
+            # Count streamed bodies as they are sent
+            response.response = self._count_streamed(endpoint, response.response)
+            size = 0
+        with self._lock:
+            histogram = self._latency.get(endpoint)
+            if histogram is None:
+                histogram = self._latency[endpoint] = Histogram()
+            histogram.observe(elapsed)
+            key = (endpoint, response.status_code)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + (size or 0)
+        return response
+
+    def _count_streamed(self, endpoint, iterable):
+        size = 0
+        try:
+            for chunk in iterable:
+                size += len(chunk) if isinstance(chunk, bytes) else len(chunk.encode('utf-8'))
+                yield chunk
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+            with self._lock:
+                self._bytes[endpoint] = self._bytes.get(endpoint, 0) + size
+
+    def _teardown_request(self, exc):
+        endpoint = g.get('metrics_endpoint')
+        if endpoint is None:
+            return
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            latency = {endpoint: histogram.copy() for endpoint, histogram in self._latency.items()}
+            statuses = dict(self._statuses)
+            sizes = dict(self._bytes)
+            in_flight = dict(self._in_flight)
+
+        lines = [
+            "# HELP portfolio_http_request_duration_seconds Request latency by endpoint",
+            "# TYPE portfolio_http_request_duration_seconds histogram",
+        ]
+        for endpoint, histogram in sorted(latency.items()):
+            lines.extend(histogram.lines('portfolio_http_request_duration_seconds', endpoint=endpoint))
+
+        lines += [
+            "# HELP portfolio_http_responses_total Responses by endpoint and status code",
+            "# TYPE portfolio_http_responses_total counter",
+        ]
+        for (endpoint, status), count in sorted(statuses.items()):
+            lines.append(f"portfolio_http_responses_total{_labels(endpoint=endpoint, status=status)} {count}")
+
+        lines += [
+            "# HELP portfolio_http_response_bytes_total Response body bytes by endpoint",
+            "# TYPE portfolio_http_response_bytes_total counter",
+        ]
+        for endpoint, size in sorted(sizes.items()):
+            lines.append(f"portfolio_http_response_bytes_total{_labels(endpoint=endpoint)} {size}")
+
+        lines += [
+            "# HELP portfolio_http_requests_in_flight Requests currently being handled",
+            "# TYPE portfolio_http_requests_in_flight gauge",
+        ]
+        for endpoint, count in sorted(in_flight.items()):
+            lines.append(f"portfolio_http_requests_in_flight{_labels(endpoint=endpoint)} {count}")
+
+        for name, help_text, func, kind in self._gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {func()}"]
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,93 @@
+"""Versioned model artifacts: JSON metadata plus raw .npy arrays
+
+Every published version lives in its own directory named after a hash
+of its contents, and a small pointer file names the current one:
+
+    <root>/current                 name of the current version
+    <root>/<version>/metadata.json format, metadata and array index
+    <root>/<version>/<name>.npy    one array per file
+
+Arrays are loaded with np.load(mmap_mode='r'), so loading costs a few
+opens and every worker process maps the same physical pages. Nothing is
+unpickled.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+FORMAT = 'portfolio-model/1'
+
+# Published versions kept on disk for workers that still map them
+KEEP_VERSIONS = 2
+
+
+def _digest(metadata, arrays):
+    h = hashlib.blake2b(digest_size=8)
+    h.update(json.dumps(metadata, sort_keys=True).encode('utf-8'))
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        h.update(f'{name}:{array.dtype.str}:{array.shape}'.encode('ascii'))
+        h.update(array.data)
+    return h.hexdigest()
+
+
+def current_path(root):
+    return os.path.join(root, 'current')
+
+
+def write_artifact(root, metadata, arrays):
+    """Publish metadata and {name: array} as the current version; returns its name
+
+    The version directory is complete before the pointer file is swapped
+    in one rename, so readers never see a partial artifact.
+    """
+    version = _digest(metadata, arrays)
+    directory = os.path.join(root, version)
+    os.makedirs(root, exist_ok=True)
+    if not os.path.isdir(directory):
+        staging = os.path.join(root, f'.{version}.tmp')
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f'{name}.npy'), array)
+        index = {name: {'dtype': np.asarray(array).dtype.str, 'shape': list(np.shape(array))}
+                 for name, array in arrays.items()}
+        with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+            json.dump({'format': FORMAT, 'version': version, 'arrays': index, **metadata}, f, indent=2)
+        os.rename(staging, directory)
+
+    pointer = current_path(root)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(version)
+    os.replace(pointer + '.tmp', pointer)
+    _prune(root, keep=version)
+    return version
+
+
+def _prune(root, keep):
+    versions = [entry for entry in os.scandir(root)
+                if entry.is_dir() and not entry.name.startswith('.') and entry.name != keep]
+    versions.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for entry in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def read_artifact(root):
+    """(version, metadata, {name: read-only mapped array}) of the current version
+
+    Raises FileNotFoundError when nothing was published.
+    """
+    with open(current_path(root)) as f:
+        version = f.read().strip()
+    directory = os.path.join(root, version)
+    with open(os.path.join(directory, 'metadata.json')) as f:
+        metadata = json.load(f)
+    if metadata.get('format') != FORMAT:
+        raise ValueError(f"{directory} has format {metadata.get('format')!r}, expected {FORMAT!r}")
+    # Plain ndarray views of the maps; np.memmap's subclass hooks only add overhead
+    arrays = {name: np.asarray(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r'))
+              for name in metadata['arrays']}
+    return version, metadata, arrays
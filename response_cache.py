@@ -0,0 +1,135 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import make_response, request
+
+from metrics import timed
+
+
+class CachedPage:
+    """A rendered 200 response plus its validators"""
+
+    __slots__ = ('body', 'mimetype', 'etag', 'last_modified')
+
+    def __init__(self, body, mimetype, last_modified):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """LRU cache of rendered pages bounded by entry count and total bytes
+
+    All entries belong to one catalog version; the first lookup with a
+    different version empties the cache.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_entries=2048):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, entry):
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def cache_key(endpoint, view_args, params):
+    """Cache key from the endpoint, URL arguments and normalized query args
+
+    Only the listed query parameters are part of the key, and empty values
+    are dropped, so '?tech=' and '?utm_source=x' share the plain page.
+    """
+    args = tuple((name, value) for name in params
+                 for value in request.args.getlist(name) if value)
+    return (endpoint, tuple(sorted(view_args.items())), args)
+
+
+def cached_page(cache, catalog, params=()):
+    """Serve a view from the page cache with strong ETag / Last-Modified
+
+    The view must be a pure function of the catalog, its URL arguments and
+    the query parameters in `params`. Conditional GETs that match a cached
+    entry get a 304 without the view running.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**view_args):
+            if request.method not in ('GET', 'HEAD'):
+                return view(**view_args)
+
+            with timed('catalog'):
+                snapshot = catalog.snapshot()
+            key = cache_key(request.endpoint, view_args, params)
+            entry = cache.get(key, snapshot.version)
+            if entry is None:
+                response = make_response(view(**view_args))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                last_modified = snapshot.stamp[0] / 1e9 if snapshot.stamp else None
+                entry = CachedPage(response.get_data(), response.mimetype, last_modified)
+                cache.put(key, snapshot.version, entry)
+
+            response = make_response(entry.body)
+            response.mimetype = entry.mimetype
+            response.set_etag(entry.etag)
+            if entry.last_modified is not None:
+                response.last_modified = entry.last_modified
+            # Let clients store the page but revalidate on every use
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
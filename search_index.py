@@ -0,0 +1,169 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Field weights for BM25F-style scoring; title and technology hits count most
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'technologies': 2.0,
+    'description': 1.5,
+    'detailed_description': 1.0,
+    'features': 1.0,
+    'readme': 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A prefix expansion scores lower than an exact token match
+PREFIX_WEIGHT = 0.6
+MAX_PREFIX_EXPANSIONS = 64
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a string"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def _field_text(value):
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    return str(value or '')
+
+
+def _fingerprint(project):
+    return hash(tuple(_field_text(project.get(field)) for field in FIELD_WEIGHTS))
+
+
+class SearchIndex:
+    """Inverted index over project text with BM25 ranking
+
+    Documents are keyed by project id. update() diffs a new project list
+    against the indexed one and only re-tokenizes added or changed
+    projects, so a reload of projects.json costs O(changed text).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs = {}          # id -> (fingerprint, {token: weighted tf}, length)
+        self._postings = {}      # token -> {id: weighted tf}
+        self._total_length = 0.0
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def update(self, projects):
+        """Sync the index with a project list; returns (added, removed) counts"""
+        wanted = {}
+        for project in projects:
+            project_id = project.get('id')
+            if project_id is not None:
+                wanted[project_id] = project
+
+        with self._lock:
+            removed = [doc_id for doc_id, doc in self._docs.items()
+                       if doc_id not in wanted or doc[0] != _fingerprint(wanted[doc_id])]
+            for doc_id in removed:
+                self._remove(doc_id)
+            added = [doc_id for doc_id in wanted if doc_id not in self._docs]
+            for doc_id in added:
+                self._add(doc_id, wanted[doc_id])
+        return len(added), len(removed)
+
+    def _add(self, doc_id, project):
+        term_freqs = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(_field_text(project.get(field))):
+                term_freqs[token] = term_freqs.get(token, 0.0) + weight
+                length += weight
+
+        for token, tf in term_freqs.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocabulary_dirty = True
+            postings[doc_id] = tf
+        self._docs[doc_id] = (_fingerprint(project), term_freqs, length)
+        self._total_length += length
+
+    def _remove(self, doc_id):
+        _, term_freqs, length = self._docs.pop(doc_id)
+        for token in term_freqs:
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_dirty = True
+        self._total_length -= length
+
+    def _expand(self, term):
+        """Indexed tokens starting with term, exact match first"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        vocabulary = self._vocabulary
+        start = bisect.bisect_left(vocabulary, term)
+        expansions = []
+        for token in vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            expansions.append(token)
+        return expansions
+
+    def match(self, query, allowed=None):
+        """Score every document containing all query terms (or a prefix of them)
+
+        Returns a dict of id -> BM25 score. If allowed is given, only those
+        ids are scored.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return {}
+
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count:
+                return {}
+            avg_length = self._total_length / doc_count
+            docs = self._docs
+            scores = None
+
+            for term in dict.fromkeys(terms):
+                term_scores = {}
+                for token in self._expand(term):
+                    postings = self._postings[token]
+                    idf = math.log(1.0 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    if token != term:
+                        idf *= PREFIX_WEIGHT
+                    for doc_id, tf in postings.items():
+                        if allowed is not None and doc_id not in allowed:
+                            continue
+                        if scores is not None and doc_id not in scores:
+                            continue
+                        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * docs[doc_id][2] / avg_length)
+                        score = idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+                        if score > term_scores.get(doc_id, 0.0):
+                            term_scores[doc_id] = score
+
+                # Every term must match: keep only documents seen for all terms
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc_id: scores[doc_id] + score
+                              for doc_id, score in term_scores.items()}
+                if not scores:
+                    break
+
+        return scores or {}
+
+    @staticmethod
+    def top(scores, k):
+        """The k best (id, score) pairs, highest score first"""
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
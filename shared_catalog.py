@@ -0,0 +1,282 @@
+"""Catalog shared by every worker process through one mapped file
+
+One process encodes projects.json into a generation file; every worker
+maps it and reads project records straight from the shared pages. A
+worker keeps the small per-project summaries (id, technologies,
+category) that its facets, skills and id lookups are built from, plus
+its own search index; a full record is decoded the first time a page
+needs it and kept until the next generation.
+"""
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+CONTROL_MAGIC = b'PCATCTL2'
+DATA_MAGIC = b'PCATDAT2'
+
+# magic, sequence (odd while a write is in progress), generation,
+# source mtime_ns, source size
+CONTROL_FORMAT = struct.Struct('<8sQQqq')
+SEQUENCE = struct.Struct('<Q')
+SEQUENCE_OFFSET = 8
+# magic, version (ascii, NUL padded), project count, extra JSON length,
+# summaries JSON length
+DATA_HEADER = struct.Struct('<8s32sIQQ')
+OFFSET = struct.Struct('<Q')
+
+# Published generations kept on disk for readers that are still opening them
+KEEP_GENERATIONS = 2
+
+# Lock-free reads of the control header tried before waiting on the
+# publisher's lock instead
+CONTROL_READ_ATTEMPTS = 100
+
+
+def default_directory(source_path):
+    """Per-source store directory, in /dev/shm when available"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else os.environ.get('TMPDIR', '/tmp')
+    digest = hashlib.blake2b(os.path.abspath(source_path).encode(), digest_size=6).hexdigest()
+    return os.path.join(base, f'portfolio-catalog-{digest}')
+
+
+def encode_catalog(data, version):
+    """Serialize catalog data into the compact binary layout
+
+    Layout: header, (count + 1) little-endian u64 record offsets, the
+    projects as compact UTF-8 JSON records back to back, the remaining
+    top-level keys as one JSON object, then the project summaries as one
+    JSON array.
+    """
+    projects = data.get('projects', [])
+    extra = {key: value for key, value in data.items() if key != 'projects'}
+    records = [json.dumps(p, separators=(',', ':'), ensure_ascii=False).encode('utf-8') for p in projects]
+    extra_blob = json.dumps(extra, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    summaries_blob = json.dumps([summary(p) for p in projects], separators=(',', ':'),
+                                ensure_ascii=False).encode('utf-8')
+
+    offsets = bytearray(OFFSET.size * (len(records) + 1))
+    position = 0
+    for i, record in enumerate(records):
+        OFFSET.pack_into(offsets, i * OFFSET.size, position)
+        position += len(record)
+    OFFSET.pack_into(offsets, len(records) * OFFSET.size, position)
+
+    header = DATA_HEADER.pack(DATA_MAGIC, version.encode('ascii')[:32], len(records), len(extra_blob),
+                              len(summaries_blob))
+    return b''.join([header, bytes(offsets)] + records + [extra_blob, summaries_blob])
+
+
+def summary(project):
+    """The fields facets, skills and id lookups read from a project"""
+    return {'id': project.get('id'), 'technologies': project.get('technologies', []),
+            'category': project.get('category', 'Other')}
+
+
+class SharedCatalogView:
+    """Read-only mmap of one published generation; records decode on demand
+
+    The mapping stays open for as long as the view is referenced, so a
+    generation file unlinked by a later publish stays readable.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, extra_length, summaries_length = DATA_HEADER.unpack_from(self._mm, 0)
+        if magic != DATA_MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a catalog store file")
+        self.version = version.rstrip(b'\0').decode('ascii')
+        self.count = count
+        self._offsets_start = DATA_HEADER.size
+        self._records_start = self._offsets_start + OFFSET.size * (count + 1)
+        self._extra_length = extra_length
+        self._summaries_length = summaries_length
+
+    def _offset(self, i):
+        return OFFSET.unpack_from(self._mm, self._offsets_start + i * OFFSET.size)[0]
+
+    def record(self, i):
+        """Decode project i straight from the shared pages"""
+        start = self._records_start + self._offset(i)
+        end = self._records_start + self._offset(i + 1)
+        return json.loads(self._mm[start:end])
+
+    def summaries(self):
+        """[summary(project)] for every project, in catalog order"""
+        start = self._records_start + self._offset(self.count) + self._extra_length
+        return json.loads(self._mm[start:start + self._summaries_length])
+
+    def data(self):
+        """The catalog dict, with 'projects' read lazily from the mapping"""
+        extra_start = self._records_start + self._offset(self.count)
+        data = json.loads(self._mm[extra_start:extra_start + self._extra_length])
+        data['projects'] = SharedProjects(self)
+        return data
+
+    def close(self):
+        self._mm.close()
+
+
+class SharedProjects(Sequence):
+    """The projects of a view as a read-only sequence
+
+    A record is decoded from the shared pages the first time it is
+    indexed and kept for the life of the generation, so only records a
+    worker's pages have used are copied. Iterating, as the search index
+    does once per generation, decodes without keeping anything.
+    `summaries` holds the small per-project fields used to build facets
+    and id lookups.
+    """
+
+    def __init__(self, view):
+        self._view = view
+        self._records = [None] * view.count
+        self.summaries = view.summaries()
+
+    def __len__(self):
+        return self._view.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._view.count))]
+        if i < 0:
+            i += self._view.count
+        if not 0 <= i < self._view.count:
+            raise IndexError(i)
+        record = self._records[i]
+        if record is None:
+            record = self._records[i] = self._view.record(i)
+        return record
+
+    def __iter__(self):
+        records = self._records
+        for i in range(self._view.count):
+            record = records[i]
+            yield self._view.record(i) if record is None else record
+
+
+class SharedCatalogStore:
+    """Catalog published once per change and read by every worker process
+
+    A small control file holds a generation counter and the stamp of the
+    source file it was built from. Publishing writes the new generation
+    to its own file, renames it into place and only then bumps the
+    counter. A worker that sees a new counter value therefore always finds
+    a complete file, and every worker moves to the same version.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._thread_lock = threading.Lock()
+        self._lock_path = os.path.join(directory, 'lock')
+        control_path = os.path.join(directory, 'control')
+        self._control = None
+        with self.locked():
+            if not self._valid_control(control_path):
+                with open(control_path + '.tmp', 'wb') as f:
+                    f.write(CONTROL_FORMAT.pack(CONTROL_MAGIC, 0, 0, -1, -1))
+                os.replace(control_path + '.tmp', control_path)
+            with open(control_path, 'r+b') as f:
+                self._control = mmap.mmap(f.fileno(), CONTROL_FORMAT.size)
+            self._repair_sequence()
+
+    @staticmethod
+    def _valid_control(path):
+        try:
+            with open(path, 'rb') as f:
+                header = f.read()
+        except FileNotFoundError:
+            return False
+        return len(header) == CONTROL_FORMAT.size and header.startswith(CONTROL_MAGIC)
+
+    @contextmanager
+    def locked(self):
+        """Exclusive across threads and processes"""
+        with self._thread_lock:
+            with open(self._lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._repair_sequence()
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _repair_sequence(self):
+        # Only a publisher holding the lock leaves the sequence odd, so an
+        # odd sequence seen with the lock held is from one that died mid-write
+        if self._control is None:
+            return
+        sequence = SEQUENCE.unpack_from(self._control, SEQUENCE_OFFSET)[0]
+        if sequence & 1:
+            SEQUENCE.pack_into(self._control, SEQUENCE_OFFSET, sequence + 1)
+
+    def _read_control(self):
+        # Seqlock: retry while a publish is writing or finished during the read
+        for _ in range(CONTROL_READ_ATTEMPTS):
+            sequence = SEQUENCE.unpack_from(self._control, SEQUENCE_OFFSET)[0]
+            if not sequence & 1:
+                _, _, generation, mtime_ns, size = CONTROL_FORMAT.unpack_from(self._control, 0)
+                if SEQUENCE.unpack_from(self._control, SEQUENCE_OFFSET)[0] == sequence:
+                    break
+            # Let a publisher in this process finish its write
+            time.sleep(0)
+        else:
+            # A slow or dead publisher: wait for its lock, which repairs the sequence
+            with self.locked():
+                _, _, generation, mtime_ns, size = CONTROL_FORMAT.unpack_from(self._control, 0)
+        stamp = None if mtime_ns < 0 else (mtime_ns, size)
+        return generation, stamp
+
+    def generation(self):
+        return self._read_control()[0]
+
+    def source_stamp(self):
+        """(mtime_ns, size) of the source file the current generation came from"""
+        return self._read_control()[1]
+
+    def _data_path(self, generation):
+        return os.path.join(self.directory, f'catalog-{generation}.bin')
+
+    def publish(self, data, version, stamp):
+        """Write a new generation; the caller must hold locked()"""
+        generation = self.generation() + 1
+        path = self._data_path(generation)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(encode_catalog(data, version))
+        os.replace(path + '.tmp', path)
+
+        mtime_ns, size = stamp if stamp is not None else (-1, -1)
+        sequence = SEQUENCE.unpack_from(self._control, SEQUENCE_OFFSET)[0]
+        SEQUENCE.pack_into(self._control, SEQUENCE_OFFSET, sequence + 1)
+        CONTROL_FORMAT.pack_into(self._control, 0, CONTROL_MAGIC, sequence + 1, generation, mtime_ns, size)
+        SEQUENCE.pack_into(self._control, SEQUENCE_OFFSET, sequence + 2)
+
+        stale = self._data_path(generation - KEEP_GENERATIONS)
+        if os.path.exists(stale):
+            # Readers that already mapped it keep their pages after unlink
+            os.unlink(stale)
+        return generation
+
+    def load(self):
+        """Map the current generation: (data, version, generation, stamp)
+
+        data['projects'] is a SharedProjects over the mapping.
+        """
+        while True:
+            generation, stamp = self._read_control()
+            try:
+                view = SharedCatalogView(self._data_path(generation))
+            except FileNotFoundError:
+                if generation == self.generation():
+                    raise
+                continue  # a newer generation was published meanwhile
+            return view.data(), view.version, generation, stamp
@@ -0,0 +1,88 @@
+import threading
+from collections import Counter
+
+
+def _ranked(counts):
+    """(tech, count) pairs, most used first, ties by name"""
+    return tuple(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+class SkillSummary:
+    """Precomputed skill rankings for one catalog version"""
+
+    def __init__(self, tech_counts, category_counts):
+        self.ranked = _ranked(tech_counts)
+        self.max_count = self.ranked[0][1] if self.ranked else 1
+        self.skills = [
+            {
+                'name': tech,
+                'proficiency': int(min(100, (count / self.max_count) * 100)),
+                'projects_count': count,
+            }
+            for tech, count in self.ranked
+        ]
+        self._by_category = {category: _ranked(counts)
+                             for category, counts in category_counts.items()}
+
+    def top(self, n):
+        """The n most used technologies as (tech, count) pairs"""
+        return self.ranked[:n]
+
+    def by_category(self, category):
+        """(tech, count) pairs for the projects in one category"""
+        return self._by_category.get(category, ())
+
+    @property
+    def categories(self):
+        return sorted(self._by_category)
+
+
+class SkillStats:
+    """Technology usage counts kept in step with the catalog
+
+    update() diffs the new project list against the last one and only
+    adjusts the counters for projects that were added, removed or whose
+    technologies or category changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._projects = {}
+        self._tech_counts = Counter()
+        self._category_counts = {}
+
+    @staticmethod
+    def _key(pos, project):
+        project_id = project.get('id')
+        return project_id if project_id is not None else ('#', pos)
+
+    def update(self, projects):
+        """Sync with a project list and return a fresh SkillSummary"""
+        wanted = {}
+        for pos, project in enumerate(projects):
+            entry = (tuple(project.get('technologies', [])), project.get('category', 'Other'))
+            wanted[self._key(pos, project)] = entry
+
+        with self._lock:
+            for key, entry in list(self._projects.items()):
+                if wanted.get(key) != entry:
+                    self._apply(entry, -1)
+                    del self._projects[key]
+            for key, entry in wanted.items():
+                if key not in self._projects:
+                    self._apply(entry, 1)
+                    self._projects[key] = entry
+            return SkillSummary(self._tech_counts, self._category_counts)
+
+    def _apply(self, entry, delta):
+        technologies, category = entry
+        category_counts = self._category_counts.setdefault(category, Counter())
+        for tech in technologies:
+            self._tech_counts[tech] += delta
+            category_counts[tech] += delta
+            if self._tech_counts[tech] <= 0:
+                del self._tech_counts[tech]
+            if category_counts[tech] <= 0:
+                del category_counts[tech]
+        if not category_counts:
+            del self._category_counts[category]
@@ -0,0 +1,42 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """A working directory with its own data/projects.json, which the app's catalog reads"""
+    os.makedirs(tmp_path / 'data')
+    shutil.copy(os.path.join(REPO, 'projects.json'), tmp_path / 'data' / 'projects.json')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def client(site):
+    from app import app, page_cache
+    page_cache.clear()
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def churn_store(tmp_path_factory):
+    """A small churn model over tenure, monthly_charges and support_calls, published to a temporary store"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    from churn import ChurnModelStore, save_model
+
+    features = ['tenure', 'monthly_charges', 'support_calls']
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, len(features)))
+    y = (X[:, 0] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(scaler.transform(X), y)
+    root = tmp_path_factory.mktemp('churn_model')
+    save_model(str(root), {'model': forest, 'scaler': scaler, 'feature_names': features})
+    return ChurnModelStore(str(root))
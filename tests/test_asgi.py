@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import asgi
+
+
+async def _request(method, path, body_parts=(), headers=()):
+    """Drive asgi.application for one request; returns (status, headers, body)"""
+    messages = [{'type': 'http.request', 'body': part, 'more_body': i < len(body_parts) - 1}
+                for i, part in enumerate(body_parts)] or [{'type': 'http.request', 'body': b''}]
+    sent = []
+
+    async def receive():
+        if messages:
+            await asyncio.sleep(0)
+            return messages.pop(0)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+             'headers': [(name.encode(), value.encode()) for name, value in headers],
+             'server': ('testserver', 80), 'client': ('127.0.0.1', 1234)}
+    await asgi.application(scope, receive, send)
+    start = sent[0]
+    return start['status'], dict(start['headers']), b''.join(m.get('body', b'') for m in sent[1:])
+
+
+async def _lifespan():
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    await asgi.application({'type': 'lifespan'}, receive, send)
+    return sent
+
+
+@pytest.fixture
+def scoring(churn_store, monkeypatch, site):
+    import routes
+    monkeypatch.setattr(routes, 'churn_models', churn_store)
+
+
+def test_serves_pages(site):
+    status, headers, body = asyncio.run(_request('GET', '/about'))
+    assert status == 200
+    assert headers[b'content-type'].startswith(b'text/html')
+    assert body
+
+
+def test_server_restart_in_one_process(site):
+    for _ in range(2):
+        assert asyncio.run(_lifespan()) == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+        assert asyncio.run(_request('GET', '/about'))[0] == 200
+
+
+def _upload(rows):
+    return b'customer_id,tenure,monthly_charges,support_calls\n' + b''.join(
+        f'c{i},{i},{i / 2},{i % 5}\n'.encode() for i in range(rows))
+
+
+def test_chunked_upload_reaches_the_view(scoring):
+    body = _upload(500)
+    parts = [body[i:i + 1000] for i in range(0, len(body), 1000)]
+    status, _, response = asyncio.run(_request('POST', '/api/churn/score?id=customer_id&format=csv', parts,
+                                               headers=[('transfer-encoding', 'chunked')]))
+    lines = response.decode().splitlines()
+    assert status == 200
+    assert lines[1].startswith('0,c0,') and lines[500].startswith('499,c499,')
+    assert 'rows=500 scored=500 invalid=0' in lines[-1]
+
+
+def test_upload_slots_work_across_event_loops(scoring, monkeypatch):
+    monkeypatch.setattr(asgi, 'MAX_UPLOADS', 1)
+    body = _upload(50)
+    parts = [body[:100], body[100:]]
+
+    async def two_uploads():
+        # The second waits on the first's slot, binding the semaphore to this loop
+        return await asyncio.gather(*(_request('POST', '/api/churn/score', parts,
+                                               headers=[('transfer-encoding', 'chunked')])
+                                      for _ in range(2)))
+
+    for _ in range(2):
+        assert [status for status, _, _ in asyncio.run(two_uploads())] == [200, 200]
+
+
+def test_benchmark_driver_starts_servers_back_to_back(site):
+    pytest.importorskip('uvicorn')
+    from app import app
+    from benchmarks.bench_routes import ASGIServerDriver
+
+    for _ in range(2):
+        driver = ASGIServerDriver(app)
+        try:
+            assert driver.get('/about')[0] == 200
+        finally:
+            driver.close()
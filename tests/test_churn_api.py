@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from churn import InvalidRecords
+
+
+@pytest.fixture
+def client(churn_store, monkeypatch):
+    import routes
+    from app import app
+    monkeypatch.setattr(routes, 'churn_models', churn_store)
+    return app.test_client()
+
+
+def _post(client, path, records):
+    # Serialized by hand so integers too large for a float64 stay integers
+    return client.post(path, data=json.dumps({'records': records}), content_type='application/json')
+
+
+@pytest.mark.parametrize('path', ['/api/churn/predict', '/api/churn/explain'])
+def test_records_are_scored(client, path):
+    response = _post(client, path, [{'tenure': 1, 'monthly_charges': 2.5, 'support_calls': 0}, [3, 4, 5]])
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 2
+
+
+@pytest.mark.parametrize('path', ['/api/churn/predict', '/api/churn/explain'])
+@pytest.mark.parametrize('records, error', [
+    ([[1, 10 ** 400, 3]], 'record 0: monthly_charges is out of range'),
+    ([[1, 2, 3], {'tenure': -10 ** 400, 'monthly_charges': 2, 'support_calls': 3}],
+     'record 1: tenure is out of range'),
+    ([[1, 2, True]], 'record 0: support_calls must be a number'),
+    ([[1, 2]], 'record 0: expected 3 values, got 2'),
+    ([{'tenure': 1, 'monthly_charges': 2}], 'record 0: missing support_calls'),
+    ([], "'records' must be a non-empty list"),
+])
+def test_invalid_records_are_400(client, path, records, error):
+    response = _post(client, path, records)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
+    assert response.get_json()['feature_names'] == ['tenure', 'monthly_charges', 'support_calls']
+
+
+def test_non_finite_values_are_rejected(churn_store):
+    with pytest.raises(InvalidRecords, match='record 0: values must be finite'):
+        churn_store.get().features([[1.0, float('nan'), 3.0]])
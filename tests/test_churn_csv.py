@@ -0,0 +1,111 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from churn import CsvBatches, InvalidRecords, stream_scores
+
+FEATURES = ['tenure', 'monthly_charges', 'support_calls']
+
+
+@pytest.fixture(scope='module')
+def model(churn_store):
+    return churn_store.get()
+
+
+@pytest.fixture
+def client(churn_store, monkeypatch):
+    import routes
+    from app import app
+    monkeypatch.setattr(routes, 'churn_models', churn_store)
+    return app.test_client()
+
+
+def _csv(rows, header='customer_id,tenure,monthly_charges,support_calls'):
+    return (header + '\n' + ''.join(row + '\n' for row in rows)).encode()
+
+
+def _score(model, body, **kwargs):
+    batches = CsvBatches(io.BytesIO(body), model.feature_names, **kwargs)
+    lines = [json.loads(line) for line in ''.join(stream_scores(model, batches)).splitlines()]
+    return lines[:-1], lines[-1]['summary']
+
+
+def test_empty_body_is_rejected(model):
+    for body in (b'', b'\n', b'  \n'):
+        with pytest.raises(InvalidRecords, match='empty CSV body'):
+            CsvBatches(io.BytesIO(body), model.feature_names)
+
+
+def test_missing_columns_are_named(model):
+    with pytest.raises(InvalidRecords, match='missing monthly_charges, support_calls'):
+        CsvBatches(io.BytesIO(b'customer_id,tenure\n1,2\n'), model.feature_names)
+    with pytest.raises(InvalidRecords, match='missing customer_id'):
+        CsvBatches(io.BytesIO(b'tenure,monthly_charges,support_calls\n'), model.feature_names,
+                   id_column='customer_id')
+
+
+def test_header_only_body_scores_nothing(model):
+    rows, summary = _score(model, _csv([]))
+    assert rows == []
+    assert (summary['rows'], summary['scored'], summary['invalid']) == (0, 0, 0)
+
+
+def test_blank_lines_are_not_rows(model):
+    body = _csv(['a,1,2,3', '', 'b,4,5,6', '   ', '']) + b'\n'
+    rows, summary = _score(model, body, id_column='customer_id')
+    assert [(row['row'], row['id']) for row in rows] == [(0, 'a'), (1, 'b')]
+    assert all('error' not in row for row in rows)
+    assert (summary['rows'], summary['scored'], summary['invalid']) == (2, 2, 0)
+    assert 'error' not in summary
+
+
+def test_bad_values_flag_only_their_rows(model):
+    rows, summary = _score(model, _csv(['a,1,2,3', 'b,x,5,6', 'c,7,,9', ',', 'd,1,2,inf']),
+                           id_column='customer_id')
+    assert [row.get('error') is None for row in rows] == [True, False, False, False, False]
+    assert (summary['scored'], summary['invalid']) == (1, 4)
+
+
+def test_chunked_input_matches_one_chunk(model):
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(400, len(FEATURES)))
+    body = _csv([f'c{i},' + ','.join(map(repr, row)) for i, row in enumerate(X.tolist())])
+    whole, summary = _score(model, body, id_column='customer_id')
+    chunked, chunked_summary = _score(model, body, id_column='customer_id', chunk_bytes=256)
+    assert chunked == whole
+    assert [row['row'] for row in chunked] == list(range(400))
+    assert chunked_summary['rows'] == summary['rows'] == 400
+    expected = model.predict_proba(X).round(6).tolist()
+    assert [row['churn_probability'] for row in whole] == expected
+
+
+def test_overlong_line_ends_the_output_with_an_error(model):
+    body = _csv(['a,1,2,3', 'b,' + '1' * 300 + ',2,3'])
+    rows, summary = _score(model, body, id_column='customer_id', chunk_bytes=128)
+    assert 'longer than 128 bytes' in summary['error']
+
+
+def test_score_endpoint_rejects_bad_headers(client):
+    response = client.post('/api/churn/score', data=b'')
+    assert response.status_code == 400
+    assert 'empty CSV body' in response.get_json()['error']
+
+    response = client.post('/api/churn/score', data=b'tenure\n1\n')
+    assert response.status_code == 400
+    assert response.get_json()['feature_names'] == FEATURES
+
+
+def test_score_endpoint_reads_a_chunked_upload(client, model):
+    body = _csv([f'c{i},{i},{i / 2},{i % 5}' for i in range(300)] + [''])
+    # Content-Length does not apply to a chunked body; the server marks it as terminated
+    response = client.post('/api/churn/score?id=customer_id&format=csv', input_stream=io.BytesIO(body),
+                           headers={'Transfer-Encoding': 'chunked'},
+                           environ_overrides={'wsgi.input_terminated': True})
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == 'row,customer_id,churn_probability,churn,error'
+    assert lines[1].startswith('0,c0,') and lines[300].startswith('299,c299,')
+    assert lines[-1].startswith('# model_version=') and 'rows=300 scored=300 invalid=0' in lines[-1]
+
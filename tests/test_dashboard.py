@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from flask import Flask
+
+from dashboard import init_dashboard, zoom_window
+from electricity import ElectricityData
+from tiles import TileStore
+
+OUTPUTS = [('consumption', 'figure'), ('summary', 'children'), ('timing', 'children'),
+           ('consumption', 'relayoutData')]
+
+
+@pytest.fixture(scope='module')
+def data(tmp_path_factory):
+    store = TileStore(str(tmp_path_factory.mktemp('tiles')))
+    return ElectricityData(store, rows=40000, meters=2, end='2024-01-01')
+
+
+@pytest.fixture(scope='module')
+def client(data):
+    server = Flask(__name__)
+    init_dashboard(server, data)
+    return server.test_client()
+
+
+def _update(client, changed, start_date, end_date, relayout, granularity='raw'):
+    inputs = [('meters', 'value', ['meter-001']), ('granularity', 'value', granularity),
+              ('dates', 'start_date', start_date), ('dates', 'end_date', end_date),
+              ('consumption', 'relayoutData', relayout)]
+    payload = {
+        'output': '..' + '...'.join(f'{id}.{prop}' for id, prop in OUTPUTS) + '..',
+        'outputs': [{'id': id, 'property': prop} for id, prop in OUTPUTS],
+        'inputs': [{'id': id, 'property': prop, 'value': value} for id, prop, value in inputs],
+        'changedPropIds': [changed],
+        'state': [],
+    }
+    response = client.post('/dashboard/_dash-update-component', json=payload)
+    assert response.status_code == 200
+    return response.get_json()['response']
+
+
+def _x_range(response):
+    x = response['consumption']['figure']['data'][0]['x']
+    return np.datetime64(x[0].replace(' ', 'T')), np.datetime64(x[-1].replace(' ', 'T'))
+
+
+ZOOM = {'xaxis.range[0]': '2023-12-01 00:00:00', 'xaxis.range[1]': '2023-12-02 00:00:00'}
+
+
+def test_zoom_narrows_the_plot(client):
+    response = _update(client, 'consumption.relayoutData', '2023-11-01', '2023-12-31', ZOOM)
+    first, last = _x_range(response)
+    assert first >= np.datetime64('2023-12-01') and last < np.datetime64('2023-12-02')
+    assert 'relayoutData' not in response.get('consumption', {})
+
+
+def test_changing_dates_resets_a_zoom(client):
+    response = _update(client, 'dates.start_date', '2023-12-10', '2023-12-20', ZOOM)
+    first, last = _x_range(response)
+    assert first >= np.datetime64('2023-12-10') and last >= np.datetime64('2023-12-20')
+    assert response['consumption']['relayoutData'] is None
+
+
+def test_date_range_is_part_of_uirevision(client):
+    one = _update(client, 'dates.end_date', '2023-12-10', '2023-12-20', None)
+    two = _update(client, 'dates.end_date', '2023-12-10', '2023-12-21', None)
+    assert (one['consumption']['figure']['layout']['uirevision']
+            != two['consumption']['figure']['layout']['uirevision'])
+
+
+def test_zoom_window():
+    start, end = np.datetime64('2023-01-01', 'ns'), np.datetime64('2023-02-01', 'ns')
+    assert zoom_window(None, start, end) == (start, end)
+    assert zoom_window({'xaxis.autorange': True}, start, end) == (start, end)
+    assert zoom_window(ZOOM, start, end) == (np.datetime64('2023-12-01', 'ns'), np.datetime64('2023-12-02', 'ns'))
+    assert zoom_window({'xaxis.range[0]': 'not a date', 'xaxis.range[1]': '2023-01-05'}, start, end) == (start, end)
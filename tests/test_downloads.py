@@ -0,0 +1,70 @@
+import gzip
+import os
+
+import pytest
+
+from app import downloads
+from downloads import precompress
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(downloads, 'directory', str(tmp_path))
+    downloads.clear()
+    (tmp_path / 'big.sql').write_text('SELECT id FROM payments;\n' * 2000)
+    (tmp_path / 'resume.pdf').write_bytes(os.urandom(4096))
+    yield tmp_path
+    downloads.clear()
+
+
+@pytest.fixture
+def client(artifacts):
+    from app import app
+    return app.test_client()
+
+
+def test_precompressed_variant_is_served(client, artifacts):
+    assert str(artifacts / 'big.sql.gz') in precompress(str(artifacts))
+    downloads.clear()
+    response = client.get('/static/downloads/big.sql', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()) == (artifacts / 'big.sql').read_bytes()
+
+    plain = client.get('/static/downloads/big.sql')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.get_data() == (artifacts / 'big.sql').read_bytes()
+    assert plain.headers['ETag'] != response.headers['ETag']
+
+
+def test_stale_variant_is_ignored(client, artifacts):
+    precompress(str(artifacts))
+    source = artifacts / 'big.sql'
+    source.write_text('SELECT 1;\n')
+    os.utime(source, (os.stat(source).st_atime, os.stat(artifacts / 'big.sql.gz').st_mtime + 10))
+    downloads.clear()
+    response = client.get('/static/downloads/big.sql', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == b'SELECT 1;\n'
+
+
+def test_range_and_conditional_requests(client):
+    first = client.get('/static/downloads/resume.pdf')
+    assert first.status_code == 200
+    assert client.get('/static/downloads/resume.pdf',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    partial = client.get('/static/downloads/resume.pdf', headers={'Range': 'bytes=100-199'})
+    assert partial.status_code == 206
+    assert partial.get_data() == first.get_data()[100:200]
+
+
+def test_pdfs_are_not_precompressed(artifacts):
+    precompress(str(artifacts))
+    assert not (artifacts / 'resume.pdf.gz').exists()
+
+
+def test_missing_files_and_directories_are_404(client, artifacts):
+    os.makedirs(artifacts / 'folder')
+    assert client.get('/static/downloads/missing.sql').status_code == 404
+    assert client.get('/static/downloads/folder').status_code == 404
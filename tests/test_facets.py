@@ -0,0 +1,57 @@
+import random
+
+from facets import FacetIndex, bits_from_positions, positions_from_bits
+
+TECHNOLOGIES = ['Python', 'SQL', 'Pandas', 'React']
+CATEGORIES = ['Data', 'Web', 'Finance']
+
+
+def _projects(count, seed=5):
+    rng = random.Random(seed)
+    return [{'id': f'p{i}', 'technologies': rng.sample(TECHNOLOGIES, rng.randint(0, 3)),
+             'category': rng.choice(CATEGORIES)} for i in range(count)]
+
+
+def _matches(project, tech, category):
+    return ((not tech or tech in project['technologies'])
+            and (not category or project.get('category', 'Other') == category))
+
+
+def test_bitset_round_trip():
+    for positions in ([], [0], [7, 8], [1, 64, 65, 200]):
+        assert positions_from_bits(bits_from_positions(positions, 256)) == positions
+
+
+def test_select_and_counts_match_a_scan():
+    projects = _projects(150)
+    facets = FacetIndex(projects)
+    assert facets.technologies == sorted({t for p in projects for t in p['technologies']})
+    for tech in [''] + TECHNOLOGIES + ['Unknown']:
+        for category in [''] + CATEGORIES:
+            bits = facets.select(tech, category)
+            expected = [p for p in projects if _matches(p, tech, category)]
+            assert facets.projects_for(bits) == expected
+            assert facets.tech_counts(bits) == {
+                t: sum(t in p['technologies'] for p in expected) for t in facets.technologies}
+            assert facets.category_counts(bits) == {
+                c: sum(p['category'] == c for p in expected) for c in facets.categories}
+
+
+def test_summaries_build_the_same_bitsets():
+    projects = _projects(40)
+    summaries = [{'id': p['id'], 'technologies': p['technologies'], 'category': p['category']} for p in projects]
+    full, split = FacetIndex(projects), FacetIndex(projects, summaries)
+    assert (split.tech_bits, split.category_bits) == (full.tech_bits, full.category_bits)
+
+
+def test_duplicate_technologies_and_missing_category():
+    facets = FacetIndex([{'technologies': ['SQL', 'SQL']}, {'technologies': ['SQL'], 'category': 'Data'}])
+    assert facets.tech_counts(facets.all_bits) == {'SQL': 2}
+    assert facets.categories == ['Data', 'Other']
+    assert facets.select(category='Other') == 0b01
+
+
+def test_empty_catalog():
+    facets = FacetIndex([])
+    assert facets.select() == 0
+    assert facets.projects_for(facets.select('Python')) == []
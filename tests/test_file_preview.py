@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from file_preview import MAX_PAGE_LINES, iter_text, line_index, read_page
+
+
+@pytest.fixture
+def lines_file(tmp_path):
+    path = tmp_path / 'query.sql'
+    path.write_text(''.join(f'SELECT {i};\n' for i in range(100)))
+    return str(path)
+
+
+def test_page_reads_only_its_lines(lines_file):
+    page = read_page(lines_file, 10, 5)
+    assert page.text == ''.join(f'SELECT {i};\n' for i in range(10, 15))
+    assert (page.first_line, page.last_line, page.line_count) == (11, 15, 100)
+    assert (page.prev_start, page.next_start) == (5, 15)
+
+
+def test_page_bounds_are_clamped(lines_file):
+    first = read_page(lines_file, -3, 10)
+    assert first.start == 0 and first.prev_start is None
+    last = read_page(lines_file, 95, 10)
+    assert last.text.count('\n') == 5 and last.next_start is None
+    past = read_page(lines_file, 500, 10)
+    assert past.text == '' and past.start == 100
+    assert read_page(lines_file, 0, MAX_PAGE_LINES * 10).count == MAX_PAGE_LINES
+    assert read_page(lines_file, 0, 0).count == 1
+
+
+def test_last_line_without_newline_and_empty_files(tmp_path):
+    path = tmp_path / 'a.py'
+    path.write_text('one\ntwo')
+    assert line_index(str(path)).line_count == 2
+    assert read_page(str(path), 1, 5).text == 'two'
+    empty = tmp_path / 'empty.py'
+    empty.write_text('')
+    assert read_page(str(empty), 0, 5).text == ''
+
+
+def test_line_index_follows_file_changes(lines_file):
+    assert line_index(lines_file).line_count == 100
+    with open(lines_file, 'a') as f:
+        f.write('SELECT 100;\n')
+    assert line_index(lines_file).line_count == 101
+
+
+def test_streamed_text_keeps_characters_split_across_chunks(tmp_path):
+    path = tmp_path / 'notes.txt'
+    text = 'naïve café — 数据 ' * 50
+    path.write_text(text, encoding='utf-8')
+    chunks = list(iter_text(str(path), chunk_size=7))
+    assert ''.join(chunks) == text
+    assert len(chunks) > 1
+
+
+def test_open_errors_raise_before_streaming(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        iter_text(str(tmp_path / 'missing.sql'))
+    with pytest.raises(IsADirectoryError):
+        iter_text(str(tmp_path))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, lines_file):
+    from app import app, downloads
+    monkeypatch.setattr(downloads, 'directory', os.path.dirname(lines_file))
+    return app.test_client()
+
+
+def test_preview_routes(client, tmp_path):
+    paged = client.get('/downloads/query.sql?start=20&count=3')
+    assert paged.status_code == 200
+    body = paged.get_data(as_text=True)
+    assert 'SELECT 20;' in body and 'SELECT 22;' in body and 'SELECT 23;' not in body
+
+    streamed = client.get('/downloads/query.sql')
+    assert streamed.status_code == 200
+    assert 'SELECT 99;' in streamed.get_data(as_text=True)
+
+    assert client.get('/downloads/missing.sql').status_code == 404
+    os.makedirs(tmp_path / 'folder.sql')
+    assert client.get('/downloads/folder.sql').status_code == 500
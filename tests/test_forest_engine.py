@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from forest_engine import FlatForest, float32_floor
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 6))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+    forest = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+    return forest, FlatForest.from_sklearn(forest), rng.normal(size=(3000, 6))
+
+
+def test_predict_proba_matches_sklearn(fitted):
+    forest, flat, X = fitted
+    np.testing.assert_allclose(flat.predict_proba(X), forest.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_rows_on_split_thresholds_match_sklearn(fitted):
+    forest, flat, _ = fitted
+    tree = forest.estimators_[0].tree_
+    splits = np.flatnonzero(tree.children_left >= 0)
+    X = np.zeros((len(splits), 6))
+    X[np.arange(len(splits)), tree.feature[splits]] = tree.threshold[splits]
+    # Values a float32 rounding step either side of each threshold
+    for X_edge in (X, np.nextafter(X.astype(np.float32), np.float32(np.inf)).astype(np.float64),
+                   np.nextafter(X.astype(np.float32), np.float32(-np.inf)).astype(np.float64)):
+        np.testing.assert_allclose(flat.predict_proba(X_edge), forest.predict_proba(X_edge), rtol=0, atol=1e-12)
+
+
+def test_small_and_empty_batches(fitted):
+    forest, flat, X = fitted
+    np.testing.assert_allclose(flat.predict_proba(X[:1]), forest.predict_proba(X[:1]), rtol=0, atol=1e-12)
+    assert flat.predict_proba(X[:0]).shape == (0, 2)
+
+
+def test_from_arrays_round_trip(fitted):
+    _, flat, X = fitted
+    copy = FlatForest.from_arrays(flat.arrays(), flat.depth)
+    np.testing.assert_array_equal(copy.predict_proba(X), flat.predict_proba(X))
+
+
+def test_contributions_sum_to_probability(fitted):
+    _, flat, X = fitted
+    bias, contributions = flat.contributions(X)
+    assert contributions.shape == X.shape
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), flat.predict_proba(X)[:, 1], atol=1e-9)
+
+
+def test_float32_floor_never_rounds_up():
+    values = np.random.default_rng(1).normal(size=10000) * 1e3
+    floored = float32_floor(values)
+    assert (floored.astype(np.float64) <= values).all()
+    assert (np.nextafter(floored, np.float32(np.inf)).astype(np.float64) > values).all()
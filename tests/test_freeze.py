@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+from app import app, asset_manifest, catalog
+from freeze import freeze, page_file
+
+
+@pytest.fixture
+def export(site):
+    static_dir = site / 'static'
+    os.makedirs(static_dir / 'css')
+    (static_dir / 'css' / 'site.css').write_text('body { margin: 0 }\n')
+    out_dir = site / 'out'
+
+    def run(**kwargs):
+        return freeze(app, catalog, asset_manifest, str(static_dir), str(out_dir), workers=1, **kwargs)
+    return run, out_dir
+
+
+def _edit_catalog(site, change):
+    path = site / 'data' / 'projects.json'
+    data = json.loads(path.read_text())
+    change(data['projects'])
+    path.write_text(json.dumps(data))
+
+
+def _pages(out_dir):
+    return json.loads((out_dir / 'manifest.json').read_text())['pages']
+
+
+def test_first_export_writes_every_page(export):
+    run, out_dir = export
+    summary = run()
+    pages = _pages(out_dir)
+    assert summary['pages'] == summary['rendered'] == summary['written'] == len(pages)
+    assert {'/', '/about'} <= pages.keys()
+    for entry in pages.values():
+        assert (out_dir / entry['file']).stat().st_size == entry['bytes']
+    assert (out_dir / 'static' / 'css' / 'site.css').exists()
+    assert not (out_dir / 'manifest.json.gz').exists()
+
+
+def test_unchanged_catalog_renders_nothing(export):
+    run, out_dir = export
+    run()
+    before = {path: os.stat(out_dir / entry['file']).st_mtime_ns for path, entry in _pages(out_dir).items()}
+    summary = run()
+    assert (summary['rendered'], summary['written'], summary['removed']) == (0, 0, 0)
+    after = {path: os.stat(out_dir / entry['file']).st_mtime_ns for path, entry in _pages(out_dir).items()}
+    assert after == before
+
+
+def test_editing_a_project_renders_only_pages_that_show_it(export, site):
+    run, out_dir = export
+    total = run()['pages']
+    edited, other = catalog.snapshot().projects[0]['id'], catalog.snapshot().projects[1]['id']
+    before = _pages(out_dir)
+
+    def rename(projects):
+        projects[0]['title'] = 'Renamed in a test'
+    _edit_catalog(site, rename)
+    summary = run()
+
+    after = _pages(out_dir)
+    assert 0 < summary['rendered'] < total
+    assert after[f'/project/{edited}']['hash'] != before[f'/project/{edited}']['hash']
+    assert after[f'/project/{other}'] == before[f'/project/{other}']
+    assert 'Renamed in a test' in (out_dir / page_file(f'/project/{edited}')).read_text()
+
+
+def test_removed_project_pages_are_deleted(export, site):
+    run, out_dir = export
+    run()
+    removed = catalog.snapshot().projects[-1]['id']
+    page = out_dir / page_file(f'/project/{removed}')
+    assert page.exists()
+
+    _edit_catalog(site, lambda projects: projects.pop())
+    summary = run()
+    assert summary['removed'] >= 1
+    assert f'/project/{removed}' not in _pages(out_dir)
+    assert not page.exists() and not page.parent.exists()
+
+
+def test_force_rerenders_every_page(export):
+    run, out_dir = export
+    first = run()
+    summary = run(force=True)
+    assert summary['rendered'] == summary['written'] == first['pages']
+
+
+def test_stale_manifest_variants_are_removed(export):
+    run, out_dir = export
+    run()
+    (out_dir / 'manifest.json.gz').write_bytes(b'stale')
+    run()
+    assert not (out_dir / 'manifest.json.gz').exists()
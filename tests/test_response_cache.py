@@ -0,0 +1,57 @@
+import json
+
+from app import catalog, page_cache
+
+
+def test_etag_revalidation_returns_304(client):
+    first = client.get('/')
+    assert first.status_code == 200
+    assert first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    again = client.get('/', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+
+
+def test_last_modified_revalidation_returns_304(client):
+    first = client.get('/about')
+    assert first.status_code == 200
+    since = first.headers['Last-Modified']
+
+    assert client.get('/about', headers={'If-Modified-Since': since}).status_code == 304
+
+
+def test_stale_etag_gets_the_page(client):
+    response = client.get('/about', headers={'If-None-Match': '"not-the-page"'})
+    assert response.status_code == 200
+    assert response.get_data()
+
+
+def test_ignored_and_empty_params_share_an_entry(client):
+    plain = client.get('/')
+    assert client.get('/?tech=&utm_source=mail').headers['ETag'] == plain.headers['ETag']
+    assert len(page_cache) == 1
+
+
+def test_unknown_project_is_404_and_not_cached(client):
+    response = client.get('/project/no-such-project')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+    assert len(page_cache) == 0
+    assert client.get('/project/no-such-project').status_code == 404
+
+
+def test_catalog_change_invalidates_cached_pages(client, site):
+    project_id = catalog.snapshot().projects[0]['id']
+    first = client.get(f'/project/{project_id}')
+    assert first.status_code == 200
+
+    path = site / 'data' / 'projects.json'
+    data = json.loads(path.read_text())
+    data['projects'][0]['title'] = 'Renamed in a test'
+    path.write_text(json.dumps(data))
+
+    response = client.get(f'/project/{project_id}', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert b'Renamed in a test' in response.get_data()
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from search_index import PREFIX_WEIGHT, SearchIndex, tokenize
+
+WORDS = ['python', 'pytorch', 'pandas', 'sql', 'server', 'mongo', 'risk', 'model', 'forecast', 'churn',
+         'dashboard', 'api', 'stream', 'cache']
+
+
+def _project(rng, i):
+    return {'id': f'p{i}', 'title': ' '.join(rng.sample(WORDS, 2)),
+            'description': ' '.join(rng.choices(WORDS, k=6)),
+            'technologies': rng.sample(['Python', 'SQL', 'Pandas', 'React'], 2)}
+
+
+def _index(projects):
+    index = SearchIndex()
+    index.update(projects)
+    return index
+
+
+def test_all_terms_must_match():
+    index = _index([{'id': 'a', 'title': 'risk model'}, {'id': 'b', 'title': 'risk dashboard'},
+                    {'id': 'c', 'title': 'churn model'}])
+    assert set(index.match('risk')) == {'a', 'b'}
+    assert set(index.match('risk model')) == {'a'}
+    assert index.match('risk nothing') == {}
+    assert index.match('  ') == {}
+
+
+def test_prefixes_expand_but_score_below_exact_tokens():
+    index = _index([{'id': 'exact', 'title': 'py'}, {'id': 'longer', 'title': 'python'},
+                    {'id': 'other', 'title': 'sql'}])
+    scores = index.match('py')
+    assert set(scores) == {'exact', 'longer'}
+    assert scores['exact'] == pytest.approx(scores['longer'] / PREFIX_WEIGHT)
+    assert set(index.match('pyt')) == {'longer'}
+
+
+def test_allowed_restricts_matches_and_top_orders_by_score():
+    index = _index([{'id': 'a', 'title': 'cache', 'description': 'cache cache'},
+                    {'id': 'b', 'title': 'cache'}, {'id': 'c', 'description': 'cache'}])
+    assert set(index.match('cache', allowed={'b', 'c'})) == {'b', 'c'}
+    ranked = [doc_id for doc_id, _ in SearchIndex.top(index.match('cache'), 2)]
+    assert ranked == ['a', 'b']
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    rng = random.Random(7)
+    projects = [_project(rng, i) for i in range(60)]
+    index = _index(projects)
+    next_id = len(projects)
+    for _ in range(25):
+        for _ in range(rng.randint(1, 5)):
+            action = rng.random()
+            if action < 0.3 and projects:
+                projects.pop(rng.randrange(len(projects)))
+            elif action < 0.6:
+                projects.append(_project(rng, next_id))
+                next_id += 1
+            else:
+                victim = rng.randrange(len(projects))
+                projects[victim] = dict(_project(rng, 0), id=projects[victim]['id'])
+        index.update(projects)
+        rebuilt = _index(projects)
+        assert len(index) == len(rebuilt)
+        for query in ('py', 'risk model', 'sql server', 'churn', 'ca', 'forecast api'):
+            expected = rebuilt.match(query)
+            assert index.match(query) == pytest.approx(expected)
+
+
+def test_update_reports_added_and_removed():
+    index = _index([{'id': 'a', 'title': 'one'}, {'id': 'b', 'title': 'two'}])
+    assert index.update([{'id': 'a', 'title': 'one'}, {'id': 'b', 'title': 'changed'},
+                         {'id': 'c', 'title': 'three'}]) == (2, 1)
+    assert set(index.match('changed')) == {'b'}
+    assert index.match('two') == {}
+
+
+def test_tokenize():
+    assert tokenize('Real-time SQL/Python 3.11!') == ['real', 'time', 'sql', 'python', '3', '11']
@@ -0,0 +1,116 @@
+import json
+import threading
+
+import pytest
+
+from catalog import ProjectCatalog
+from shared_catalog import SEQUENCE, SEQUENCE_OFFSET, SharedCatalogStore, SharedCatalogView
+
+
+def _catalog_data(tag, count=5):
+    projects = [{'id': f'p{i}', 'title': f'{tag} project {i}', 'description': f'about {tag}',
+                 'technologies': ['Python', f'T{i % 2}'], 'category': f'C{i % 3}'} for i in range(count)]
+    return {'projects': projects, 'owner': tag}
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data))
+
+
+def test_view_reads_records_summaries_and_extra_keys(tmp_path):
+    store = SharedCatalogStore(str(tmp_path / 'store'))
+    data = _catalog_data('one')
+    with store.locked():
+        store.publish(data, 'v1', (1, 2))
+    loaded, version, generation, stamp = store.load()
+    assert (version, generation, stamp) == ('v1', 1, (1, 2))
+    assert loaded['owner'] == 'one'
+    projects = loaded['projects']
+    assert list(projects) == data['projects']
+    assert projects[-1] == data['projects'][-1]
+    assert projects[1:3] == data['projects'][1:3]
+    assert projects.summaries[2] == {'id': 'p2', 'technologies': ['Python', 'T0'], 'category': 'C2'}
+    with pytest.raises(IndexError):
+        projects[len(projects)]
+
+
+def test_workers_switch_generation_together(tmp_path):
+    source = tmp_path / 'projects.json'
+    _write(source, _catalog_data('one'))
+    workers = [ProjectCatalog(str(source), store=SharedCatalogStore(str(tmp_path / 'store'))) for _ in range(2)]
+    first = [worker.snapshot() for worker in workers]
+    assert first[0].generation == first[1].generation == 1
+    assert first[0].version == first[1].version
+
+    _write(source, _catalog_data('two', count=7))
+    second = [worker.snapshot() for worker in workers]
+    assert second[0].generation == second[1].generation == 2
+    assert all(snap.get('p6')['title'] == 'two project 6' for snap in second)
+    # Only the first worker to notice parsed the file
+    assert sum(worker.reloads for worker in workers) == 4
+    # The old snapshot stays readable after the switch
+    assert first[1].get('p0')['title'] == 'one project 0'
+
+
+def test_shared_search_matches_local(tmp_path):
+    source = tmp_path / 'projects.json'
+    _write(source, _catalog_data('alpha', count=20))
+    local = ProjectCatalog(str(source)).snapshot()
+    shared = ProjectCatalog(str(source), store=SharedCatalogStore(str(tmp_path / 'store'))).snapshot()
+    for within in (None, local.facets.select('T1'), local.facets.select('T0', 'C1')):
+        assert shared.search('alpha', 5, within=within) == local.search('alpha', 5, within=within)
+    assert shared.facets.projects_for(shared.facets.select('T1')) == local.facets.projects_for(
+        local.facets.select('T1'))
+
+
+def test_readers_never_see_a_partial_publish(tmp_path):
+    directory = str(tmp_path / 'store')
+    publisher, reader = SharedCatalogStore(directory), SharedCatalogStore(directory)
+    with publisher.locked():
+        publisher.publish(_catalog_data('v0'), 'v0', None)
+    done = threading.Event()
+    problems = []
+
+    def read():
+        while not done.is_set():
+            data, version, generation, _ = reader.load()
+            if data['owner'] != version or data['projects'][0]['title'] != f'{version} project 0':
+                problems.append((version, generation))
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for n in range(1, 60):
+        with publisher.locked():
+            publisher.publish(_catalog_data(f'v{n}'), f'v{n}', (n, n))
+    done.set()
+    for thread in threads:
+        thread.join()
+    assert problems == []
+    assert reader.generation() == 60
+
+
+def test_odd_sequence_left_by_a_dead_publisher_is_repaired(tmp_path):
+    directory = str(tmp_path / 'store')
+    store = SharedCatalogStore(directory)
+    with store.locked():
+        store.publish(_catalog_data('one'), 'v1', (1, 1))
+
+    # A publisher that died between its two sequence writes
+    SEQUENCE.pack_into(store._control, SEQUENCE_OFFSET, 3)
+    assert store.generation() == 1
+    assert SEQUENCE.unpack_from(store._control, SEQUENCE_OFFSET)[0] == 4
+
+    # Left in the file across restarts: a new store repairs it on open
+    SEQUENCE.pack_into(store._control, SEQUENCE_OFFSET, 5)
+    store._control.flush()
+    reopened = SharedCatalogStore(directory)
+    assert SEQUENCE.unpack_from(reopened._control, SEQUENCE_OFFSET)[0] == 6
+    assert reopened.source_stamp() == (1, 1)
+
+
+def test_view_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-catalog.bin'
+    path.write_bytes(b'\0' * 128)
+    with pytest.raises(ValueError):
+        SharedCatalogView(str(path))
@@ -0,0 +1,64 @@
+import random
+
+from skills import SkillStats
+
+TECHNOLOGIES = ['Python', 'SQL', 'Pandas', 'React', 'Docker', 'R']
+CATEGORIES = ['Data', 'Web', 'Finance']
+
+
+def _project(rng, project_id):
+    return {'id': project_id, 'technologies': rng.sample(TECHNOLOGIES, rng.randint(0, 3)),
+            'category': rng.choice(CATEGORIES)}
+
+
+def _summary(projects):
+    return SkillStats().update(projects)
+
+
+def test_counts_and_proficiency():
+    summary = _summary([
+        {'id': 'a', 'technologies': ['Python', 'SQL'], 'category': 'Data'},
+        {'id': 'b', 'technologies': ['Python'], 'category': 'Web'},
+        {'id': 'c', 'technologies': ['React', 'Python']},
+    ])
+    assert summary.top(2) == (('Python', 3), ('React', 1))
+    assert summary.skills[0] == {'name': 'Python', 'proficiency': 100, 'projects_count': 3}
+    assert summary.skills[1]['proficiency'] == 33
+    assert summary.by_category('Data') == (('Python', 1), ('SQL', 1))
+    assert summary.categories == ['Data', 'Other', 'Web']
+    assert summary.by_category('Missing') == ()
+
+
+def test_empty_catalog():
+    summary = _summary([])
+    assert summary.skills == [] and summary.top(3) == () and summary.categories == []
+
+
+def test_projects_without_ids_are_counted_by_position():
+    stats = SkillStats()
+    stats.update([{'technologies': ['SQL']}, {'technologies': ['SQL']}])
+    assert stats.update([{'technologies': ['SQL']}]).top(1) == (('SQL', 1),)
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    rng = random.Random(3)
+    projects = [_project(rng, f'p{i}') for i in range(40)]
+    stats = SkillStats()
+    stats.update(projects)
+    next_id = len(projects)
+    for _ in range(30):
+        for _ in range(rng.randint(1, 4)):
+            action = rng.random()
+            if action < 0.3 and projects:
+                projects.pop(rng.randrange(len(projects)))
+            elif action < 0.6:
+                projects.append(_project(rng, f'p{next_id}'))
+                next_id += 1
+            else:
+                victim = rng.randrange(len(projects))
+                projects[victim] = _project(rng, projects[victim]['id'])
+        incremental, rebuilt = stats.update(projects), _summary(projects)
+        assert incremental.skills == rebuilt.skills
+        assert incremental.categories == rebuilt.categories
+        for category in CATEGORIES:
+            assert incremental.by_category(category) == rebuilt.by_category(category)
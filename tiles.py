@@ -0,0 +1,291 @@
+"""Multi-resolution tile pyramid of meter readings in memory-mapped files
+
+Every level splits time into fixed-width buckets counted from the epoch,
+and each run of `tile_buckets` buckets of one meter is a tile: a
+(columns, tile_buckets) .npy file with one contiguous row per statistic.
+A query maps only the tiles overlapping its window, and an append only
+rewrites the buckets its readings fall into, so neither cost grows with
+the length of the history.
+
+    <directory>/manifest.json            first/last reading per meter
+    <directory>/<meter>/<level>/<n>.npy  tile n of that meter and level
+"""
+import fcntl
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+STATS = ('sum', 'count', 'min', 'max')
+
+# Tile maps kept open per process
+MAX_OPEN_TILES = 4096
+
+
+class Level:
+    """One resolution of the pyramid"""
+
+    def __init__(self, name, width, columns, dtype, tile_buckets):
+        self.name = name
+        self.width = int(np.timedelta64(width, 'ns').astype(np.int64))
+        self.columns = columns
+        self.dtype = np.dtype(dtype)
+        self.tile_buckets = tile_buckets
+
+    @property
+    def raw(self):
+        return self.columns == ('sum',)
+
+    def row(self, column):
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            raise ValueError(f"level {self.name} has no {column!r} column") from None
+
+    def empty_tile(self):
+        tile = np.empty((len(self.columns), self.tile_buckets), dtype=self.dtype)
+        if self.raw:
+            # NaN marks a bucket without a reading
+            tile[0] = np.nan
+        else:
+            tile[self.row('sum')] = 0
+            tile[self.row('count')] = 0
+            tile[self.row('min')] = np.inf
+            tile[self.row('max')] = -np.inf
+        return tile
+
+
+# The raw level holds the 15-minute readings themselves; the others are
+# rollups of them. Tiles span about 170 days (raw, hourly) or 2.8 years
+# (daily), so a full-history view maps a few dozen files per meter.
+LEVELS = {level.name: level for level in (
+    Level('raw', np.timedelta64(15, 'm'), ('sum',), np.float32, 16384),
+    Level('hourly', np.timedelta64(1, 'h'), STATS, np.float64, 4096),
+    Level('daily', np.timedelta64(1, 'D'), STATS, np.float64, 1024),
+)}
+
+
+class Buckets:
+    """Non-empty buckets of one level: bucket numbers plus the requested columns"""
+
+    __slots__ = ('level', 'index', 'columns')
+
+    def __init__(self, level, index, columns):
+        self.level = level
+        self.index = index
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    @property
+    def times(self):
+        """Start time of each bucket"""
+        return (self.index * self.level.width).astype('datetime64[ns]')
+
+
+def _ns(value):
+    return int(np.datetime64(value, 'ns').astype(np.int64))
+
+
+class TileStore:
+    """Tile pyramid for many meters, appended to by one writer at a time
+
+    Readers in any process map tiles read-only; the maps are shared, so
+    they see appends made through other processes without reopening.
+    """
+
+    def __init__(self, directory, max_open_tiles=MAX_OPEN_TILES):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.max_open_tiles = max_open_tiles
+        self._tiles = OrderedDict()
+        self._tiles_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+        self._manifest = {}
+        self._manifest_stamp = None
+
+    @contextmanager
+    def locked(self):
+        """Exclusive across threads and processes; reentrant within a thread"""
+        with self._write_lock:
+            if self._lock_depth == 0:
+                self._lock_file = open(os.path.join(self.directory, 'lock'), 'a')
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, 'manifest.json')
+
+    def manifest(self):
+        """{meter: {'first': ns, 'last': ns, 'readings': n}}, re-read when the file changes"""
+        try:
+            st = os.stat(self._manifest_path())
+        except FileNotFoundError:
+            return {}
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._manifest_stamp:
+            with open(self._manifest_path()) as f:
+                self._manifest = json.load(f)
+            self._manifest_stamp = stamp
+        return self._manifest
+
+    def _write_manifest(self, manifest):
+        path = self._manifest_path()
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+        st = os.stat(path)
+        self._manifest, self._manifest_stamp = manifest, (st.st_mtime_ns, st.st_size)
+
+    def meters(self):
+        return sorted(self.manifest())
+
+    def span(self, meter):
+        """(first reading, end of last raw bucket) of a meter, or None"""
+        entry = self.manifest().get(meter)
+        if entry is None:
+            return None
+        return (np.datetime64(entry['first'], 'ns'),
+                np.datetime64(entry['last'] + LEVELS['raw'].width, 'ns'))
+
+    def _tile_path(self, meter, level, number):
+        return os.path.join(self.directory, meter, level.name, f'{number}.npy')
+
+    def _open(self, meter, level, number):
+        """Read-only map of a tile, or None if it was never written"""
+        key = (meter, level.name, number)
+        with self._tiles_lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                return tile
+        try:
+            tile = np.load(self._tile_path(meter, level, number), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        with self._tiles_lock:
+            self._tiles[key] = tile
+            while len(self._tiles) > self.max_open_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def _writable(self, meter, level, number):
+        path = self._tile_path(meter, level, number)
+        if not os.path.exists(path):
+            # Publish an initialised tile in one rename so readers never map a half-written one
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.save(path + '.tmp.npy', level.empty_tile())
+            os.replace(path + '.tmp.npy', path)
+        return np.load(path, mmap_mode='r+')
+
+    def append(self, meter, times, values):
+        """Add readings newer than the meter's last one; returns how many were stored
+
+        Readings at or before the last stored one are skipped, so
+        re-sending an overlapping batch does not count anything twice.
+        """
+        times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[order]
+        with self.locked():
+            manifest = dict(self.manifest())
+            entry = manifest.get(meter)
+            if entry is not None:
+                newer = times > entry['last']
+                times, values = times[newer], values[newer]
+            if not len(times):
+                return 0
+            for level in LEVELS.values():
+                self._write_level(meter, level, times, values)
+            manifest[meter] = {
+                'first': int(times[0]) if entry is None else entry['first'],
+                'last': int(times[-1]),
+                'readings': len(times) + (0 if entry is None else entry['readings']),
+            }
+            self._write_manifest(manifest)
+        return len(times)
+
+    def _write_level(self, meter, level, times, values):
+        buckets = times // level.width
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        numbers = buckets[starts]
+        sums = np.add.reduceat(values, starts)
+        if not level.raw:
+            counts = np.diff(np.append(starts, len(values)))
+            lows = np.minimum.reduceat(values, starts)
+            highs = np.maximum.reduceat(values, starts)
+
+        tiles = numbers // level.tile_buckets
+        offsets = numbers % level.tile_buckets
+        bounds = np.flatnonzero(np.concatenate(([True], tiles[1:] != tiles[:-1], [True])))
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            tile = self._writable(meter, level, int(tiles[lo]))
+            at = offsets[lo:hi]
+            if level.raw:
+                tile[0, at] = np.where(np.isnan(tile[0, at]), 0, tile[0, at]) + sums[lo:hi]
+            else:
+                tile[level.row('sum'), at] += sums[lo:hi]
+                tile[level.row('count'), at] += counts[lo:hi]
+                tile[level.row('min'), at] = np.minimum(tile[level.row('min'), at], lows[lo:hi])
+                tile[level.row('max'), at] = np.maximum(tile[level.row('max'), at], highs[lo:hi])
+            tile.flush()
+
+    def query(self, meter, level_name, start=None, end=None, columns=('sum',)):
+        """Non-empty buckets of a level overlapping [start, end)"""
+        level = LEVELS[level_name]
+        rows = [level.row(column) for column in columns]
+        span = self.span(meter)
+        if span is None:
+            return Buckets(level, np.empty(0, dtype=np.int64), {c: np.empty(0) for c in columns})
+        first = _ns(span[0] if start is None else max(np.datetime64(start, 'ns'), span[0]))
+        last = _ns(span[1] if end is None else min(np.datetime64(end, 'ns'), span[1]))
+        b0 = first // level.width
+        b1 = max(b0, -(-last // level.width))
+
+        fill = level.empty_tile()[:, 0]
+        out = [np.full(b1 - b0, fill[row], dtype=level.dtype) for row in rows]
+        # Raw buckets are present when not NaN, rollup buckets when counted
+        presence_row = 0 if level.raw else level.row('count')
+        if presence_row in rows:
+            presence = out[rows.index(presence_row)]
+        else:
+            presence = np.full(b1 - b0, fill[presence_row], dtype=level.dtype)
+            out.append(presence)
+            rows.append(presence_row)
+
+        size = level.tile_buckets
+        for number in range(b0 // size, -(-b1 // size)):
+            tile = self._open(meter, level, number)
+            if tile is None:
+                continue
+            lo = max(b0, number * size)
+            hi = min(b1, (number + 1) * size)
+            src = slice(lo - number * size, hi - number * size)
+            dst = slice(lo - b0, hi - b0)
+            for column, row in zip(out, rows):
+                column[dst] = tile[row, src]
+
+        keep = ~np.isnan(presence) if level.raw else presence > 0
+        if keep.all():
+            # No gaps: skip the gather
+            return Buckets(level, np.arange(b0, b1), dict(zip(columns, out)))
+        index = b0 + np.flatnonzero(keep)
+        return Buckets(level, index, {column: values[keep] for column, values in zip(columns, out)})
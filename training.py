@@ -0,0 +1,159 @@
+"""Cross-validated hyperparameter search for the churn model over a process pool
+
+The training data is written once as .npy files named after its hash,
+and every worker maps them read-only instead of receiving a pickled
+copy. Each (parameters, fold) fit is one task. Its scores are saved as
+a small JSON file keyed by the data hash, the parameters and the fold,
+so a re-run only fits the combinations it has not seen.
+
+    <cache_dir>/<data hash>/X.npy, y.npy, folds.npy
+    <cache_dir>/<data hash>/results/<params key>-<fold>.json
+"""
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Fixed settings shared by every candidate
+BASE_PARAMS = {"class_weight": "balanced"}
+
+# Candidates tried by create_model.py. Depth stays bounded: the served
+# forest takes one vectorized step per level of its deepest tree.
+PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [6, 10, 14],
+    "min_samples_split": [2, 5, 10],
+}
+
+# Fold score that picks the winning parameters
+SELECTION_METRIC = "auc_score"
+
+RANDOM_STATE = 42
+
+
+def data_hash(X, y, folds):
+    h = hashlib.blake2b(digest_size=8)
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        h.update(f'{array.dtype.str}{array.shape}'.encode('ascii'))
+        h.update(array.data)
+    h.update(f'folds={folds}'.encode('ascii'))
+    return h.hexdigest()
+
+
+def params_key(params):
+    return hashlib.blake2b(json.dumps(params, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def grid(param_grid):
+    """Every combination of a {name: [values]} grid, merged over BASE_PARAMS"""
+    names = sorted(param_grid)
+    for values in itertools.product(*(param_grid[name] for name in names)):
+        yield dict(BASE_PARAMS, **dict(zip(names, values)))
+
+
+def share_data(cache_dir, X, y, folds):
+    """Write X, y and stratified fold assignments once; returns their directory"""
+    from sklearn.model_selection import StratifiedKFold
+
+    directory = os.path.join(cache_dir, data_hash(X, y, folds))
+    if not os.path.exists(os.path.join(directory, 'folds.npy')):
+        os.makedirs(os.path.join(directory, 'results'), exist_ok=True)
+        assignment = np.empty(len(y), dtype=np.int8)
+        splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE)
+        for fold, (_, test) in enumerate(splitter.split(X, y)):
+            assignment[test] = fold
+        np.save(os.path.join(directory, 'X.npy'), np.ascontiguousarray(X, dtype=np.float64))
+        np.save(os.path.join(directory, 'y.npy'), np.ascontiguousarray(y, dtype=np.int64))
+        # Written last: its presence marks the directory complete
+        np.save(os.path.join(directory, 'folds.tmp.npy'), assignment)
+        os.replace(os.path.join(directory, 'folds.tmp.npy'), os.path.join(directory, 'folds.npy'))
+    return directory
+
+
+def _result_path(directory, params, fold):
+    return os.path.join(directory, 'results', f'{params_key(params)}-{fold}.json')
+
+
+def scores(y_true, probabilities):
+    """Held-out metrics in the shape stored as model_performance"""
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+    predictions = (probabilities >= 0.5).astype(np.int64)
+    return {
+        "accuracy": round(float(accuracy_score(y_true, predictions)), 4),
+        "precision": round(float(precision_score(y_true, predictions, zero_division=0)), 4),
+        "recall": round(float(recall_score(y_true, predictions, zero_division=0)), 4),
+        "f1_score": round(float(f1_score(y_true, predictions, zero_division=0)), 4),
+        "auc_score": round(float(roc_auc_score(y_true, probabilities)), 4),
+    }
+
+
+def fit(X, y, params):
+    """Fit the scaler and forest on X, y"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=1, **params)
+    model.fit(scaler.transform(X), y)
+    return scaler, model
+
+
+def fit_fold(directory, params, fold):
+    """Worker task: fit on every fold but one, score the held-out one and cache it"""
+    path = _result_path(directory, params, fold)
+    X = np.load(os.path.join(directory, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(directory, 'y.npy'), mmap_mode='r')
+    held_out = np.load(os.path.join(directory, 'folds.npy'), mmap_mode='r') == fold
+    started = time.perf_counter()
+    scaler, model = fit(X[~held_out], y[~held_out], params)
+    result = scores(y[held_out], model.predict_proba(scaler.transform(X[held_out]))[:, 1])
+    result['fit_seconds'] = round(time.perf_counter() - started, 3)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'params': params, 'fold': fold, 'scores': result}, f)
+    os.replace(path + '.tmp', path)
+    return result
+
+
+def search(X, y, param_grid=PARAM_GRID, folds=5, cache_dir='data/training_cache', workers=None):
+    """Cross-validate every candidate in the grid; returns results best first
+
+    Each result is {'params', 'mean', 'folds'} with mean the per-metric
+    average over folds. Cached fold results are reused; the rest run on
+    a pool of `workers` processes (default: one per core).
+    """
+    directory = share_data(cache_dir, X, y, folds)
+    candidates = list(grid(param_grid))
+    fold_scores = {}
+    pending = []
+    for i, params in enumerate(candidates):
+        for fold in range(folds):
+            try:
+                with open(_result_path(directory, params, fold)) as f:
+                    fold_scores[i, fold] = json.load(f)['scores']
+            except FileNotFoundError:
+                pending.append((i, fold))
+
+    logging.info("Cross-validating %d candidates x %d folds: %d cached, %d to fit",
+                 len(candidates), folds, len(fold_scores), len(pending))
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = {(i, fold): pool.submit(fit_fold, directory, candidates[i], fold) for i, fold in pending}
+            for key, future in futures.items():
+                fold_scores[key] = future.result()
+
+    results = []
+    for i, params in enumerate(candidates):
+        per_fold = [fold_scores[i, fold] for fold in range(folds)]
+        mean = {metric: round(float(np.mean([s[metric] for s in per_fold])), 4)
+                for metric in per_fold[0] if metric != 'fit_seconds'}
+        results.append({'params': params, 'mean': mean, 'folds': per_fold})
+    results.sort(key=lambda result: -result['mean'][SELECTION_METRIC])
+    return results